@@ -0,0 +1,113 @@
+import copy
+import pickle
+
+
+class ActionRecorder:
+    """ Records, per tick, what the agents of a GridWorld decided on, such that the run can be replayed without them.
+
+    For every tick the recorder stores for each agent that decided: the action it chose with its arguments and the
+    properties it changed. In addition it stores the messages each agent sent (including those sent through the API),
+    and the log data of each agent when the world has loggers. As the decisions of human agents are recorded, the user
+    input they received is not needed to replay them.
+
+    A GridWorld records its run when created with `record_actions=True`, see `GridWorld.action_recorder`. The recording
+    can be saved and loaded, and replayed by the same world (created from the same builder and random seed) through
+    `GridWorld.replay`. During a replay the agent brains are bypassed: the recorded actions are performed directly, so
+    the world goes through the same states at a fraction of the compute. This allows logs to be regenerated, or new
+    loggers and goals to be run against a past session, including those in which humans controlled agents.
+
+    Examples
+    --------
+    Record a run, and later replay it with an additional logger:
+
+    >>> from matrx import WorldBuilder
+    >>> from matrx.agents import AgentBrain
+    >>> from matrx.action_recorder import ActionRecorder
+    >>> from matrx.logger.log_agent_actions import LogActions
+    >>> builder = WorldBuilder(shape=(10, 10), random_seed=42, simulation_goal=100, record_actions=True)
+    >>> builder.add_agent((1, 1), AgentBrain(), name="agent")
+    >>> world = builder.get_world()
+    >>> world.run(builder.api_info)
+    >>> world.action_recorder.save("session.rec")
+    >>> builder = WorldBuilder(shape=(10, 10), random_seed=42, simulation_goal=100)
+    >>> builder.add_agent((1, 1), AgentBrain(), name="agent")
+    >>> builder.add_logger(LogActions)
+    >>> world = builder.get_world()
+    >>> world.replay(ActionRecorder.load("session.rec"))
+    >>> world.run(builder.api_info)
+    """
+
+    def __init__(self, agent_ids=()):
+        """ Create an empty recorder.
+
+        Parameters
+        ----------
+        agent_ids : iterable (optional, default ())
+            The IDs of the agents of the recorded world, used to check that a replaying world has the same agents.
+        """
+        self.agent_ids = list(agent_ids)
+        self.__ticks = {}  # tick (keys) and a dictionary with what was recorded that tick (values), see __get_tick
+
+    @property
+    def nr_ticks(self):
+        """ The number of ticks that were recorded, i.e. one more than the last tick in which anything was recorded. """
+        return max(self.__ticks.keys()) + 1 if len(self.__ticks) > 0 else 0
+
+    def get_decision(self, tick, agent_id):
+        """ Returns the decision of an agent in a tick.
+
+        Returns
+        -------
+        tuple or None
+            The properties the agent changed (a dictionary or None), the name of the action it chose (None when idling)
+            and the arguments of that action. None when the agent did not decide in that tick.
+        """
+        return self.__ticks.get(tick, {}).get("decisions", {}).get(agent_id)
+
+    def get_messages(self, tick, agent_id):
+        """ Returns a list of the messages an agent sent in a tick, empty if it sent none. """
+        return list(self.__ticks.get(tick, {}).get("messages", {}).get(agent_id, []))
+
+    def get_log_data(self, tick, agent_id):
+        """ Returns the log data of an agent in a tick, None if it was not recorded as the world had no loggers. """
+        return self.__ticks.get(tick, {}).get("log_data", {}).get(agent_id)
+
+    def _record_decision(self, tick, agent_id, changed_properties, action_name, action_kwargs):
+        """ Records the decision of an agent, with only the properties it changed. """
+        action_kwargs = copy.copy(action_kwargs) if action_kwargs is not None else {}
+        self.__get_tick(tick, "decisions")[agent_id] = (changed_properties, action_name, action_kwargs)
+
+    def _record_messages(self, tick, agent_id, messages):
+        if len(messages) > 0:
+            self.__get_tick(tick, "messages")[agent_id] = list(messages)
+
+    def _record_log_data(self, tick, agent_id, log_data):
+        self.__get_tick(tick, "log_data")[agent_id] = copy.deepcopy(log_data)
+
+    def __get_tick(self, tick, kind):
+        """ Returns the dictionary (with agent IDs as keys) of what was recorded of the given kind in the given tick.
+        The kinds are "decisions", "messages" and "log_data".
+        """
+        return self.__ticks.setdefault(tick, {}).setdefault(kind, {})
+
+    def save(self, file_path):
+        """ Writes the recording to the given file. All action arguments, messages and log data should be picklable.
+        """
+        with open(file_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(file_path):
+        """ Reads a recording written with `save` from the given file.
+
+        Raises
+        ------
+        ValueError
+            When the file does not contain a recording.
+        """
+        with open(file_path, "rb") as f:
+            recorder = pickle.load(f)
+        if not isinstance(recorder, ActionRecorder):
+            raise ValueError(f"The file {file_path} does not contain a {ActionRecorder.__name__}, but a "
+                             f"{type(recorder)}.")
+        return recorder
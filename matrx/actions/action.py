@@ -28,6 +28,12 @@ class Action:
         in the :meth:`matrx.agents.agent_brain.AgentBrain.decide_on_action` method, as so:
         ``return >action_name<, {'action_duration': >ticks<}``
 
+    Notes
+    -----
+    A :class:`matrx.grid_world.GridWorld` creates a single instance of each
+    action and reuses it for all agents and ticks. Hence, an action should not
+    store anything on itself in :meth:`is_possible` or :meth:`mutate`.
+
     """
 
     def __init__(self, duration_in_ticks=0):
@@ -366,8 +366,9 @@ class GrabObject(Action):
         env_obj = grid_world.environment_objects[object_id]  # Environment object
 
         # Updating properties
-        env_obj.carried_by.append(agent_id)
+        env_obj.carried_by = env_obj.carried_by + [agent_id]  # a new list, so the object's properties are updated
         reg_ag.is_carrying.append(env_obj)  # we add the entire object!
+        grid_world.object_store.carried_by_changed(env_obj.obj_id, env_obj.carried_by)
 
         # Remove it from the grid world (it is now stored in the is_carrying list of the AgentAvatar
         succeeded = grid_world.remove_from_grid(object_id=env_obj.obj_id, remove_from_carrier=False)
@@ -814,7 +815,8 @@ def _act_drop(grid_world, agent, env_obj, drop_loc):
 
     # Updating properties
     agent.is_carrying.remove(env_obj)
-    env_obj.carried_by.remove(agent.obj_id)
+    env_obj.carried_by = [carrier_id for carrier_id in env_obj.carried_by if carrier_id != agent.obj_id]
+    grid_world.object_store.carried_by_changed(env_obj.obj_id, env_obj.carried_by)
 
     # We return the object to the grid location we are standing at without registering a new ID
     env_obj.location = drop_loc
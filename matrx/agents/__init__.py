@@ -5,3 +5,4 @@ from matrx.agents.agent_types.patrolling_agent import PatrollingAgentBrain
 from matrx.agents.agent_utils.navigator import Navigator
 # from matrx.agents.agent_utils.task_manager import TaskManager
 from matrx.agents.agent_utils.state_tracker import StateTracker
+from matrx.agents.agent_utils.brain_host import BrainHost, RemoteAgentBrain
@@ -1,5 +1,6 @@
 import copy
 import json
+import time
 import warnings
 
 import numpy as np
@@ -12,6 +13,12 @@ class AgentBrain:
     """ An artificial agent whose behaviour can be programmed to be, for example, (semi-)autonomous.
     """
 
+    # Whether the state is updated while the agent is busy, see the Attributes of __init__
+    needs_perception_when_busy = True
+
+    # The durations of the last filter_observations and decide_on_action, see the Attributes of __init__
+    decision_durations = None
+
     def __init__(self, memorize_for_ticks=None):
         """ Defines the behavior of an agent.
 
@@ -53,8 +60,20 @@ class AgentBrain:
 
             These can be adjusted iff they are said to be adjustable (e.g. inside
             the attribute `keys_of_agent_writable_props`).
+        decision_durations: (float, float)
+            The durations (in seconds) of the last call to `filter_observations`
+            and to `decide_on_action` when deciding on an action, which the
+            GridWorld uses when profiling its ticks. None before the first
+            decision.
         keys_of_agent_writable_props: [str, ...]
             List of property names that this agent can adjust.
+        needs_perception_when_busy: bool
+            Whether this agent's state is updated and its `filter_observations`
+            called in every tick, also while it is busy performing an action
+            (True by default). Set it to False when `filter_observations` has no
+            side effects and the agent does not memorize objects, to skip
+            computing the agent's perception while it is busy. Loggers can still
+            ask for it (see `GridWorldLoggerV2.agents_needing_perception`).
         messages_to_send: [Message, ...]
             List of messages this agent will send. Use the method
             :meth:`matrx.agents.agent_brain.AgentBrain.send_message` to append to
@@ -168,6 +187,11 @@ class AgentBrain:
 
         Notes
         -----
+        While the agent is busy performing an action, this method is only
+        called when its filtered state is actually used; when the MATRX API
+        runs, when a logger is added or when the agent memorizes objects (see
+        `memorize_for_ticks`).
+
         A future version of MATRX will include handy utility function to make
         state filtering less of a hassle (e.g. to easily remove specific
         objects or properties, but also ray casting to remove objects behind
@@ -558,10 +582,13 @@ class AgentBrain:
         self.state.state_update(state.as_dict())
 
         # Call the filter method to filter the observation
+        filter_start_time = time.perf_counter()
         self.state = self.filter_observations(self.state)
 
         # Call the method that decides on an action
+        decide_start_time = time.perf_counter()
         action, action_kwargs = self.decide_on_action(self.state)
+        self.decision_durations = (decide_start_time - filter_start_time, time.perf_counter() - decide_start_time)
 
         # Store the action so in the next call the agent still knows what it did
         self.previous_action = action
@@ -1,5 +1,6 @@
 import warnings
 import copy
+import time
 
 from matrx.actions.object_actions import GrabObject, DropObject, RemoveObject
 from matrx.actions.door_actions import OpenDoorAction, CloseDoorAction
@@ -151,13 +152,16 @@ class HumanAgentBrain(AgentBrain):
         self.state.state_update(state.as_dict())
 
         # Call the filter method to filter the observation
+        filter_start_time = time.perf_counter()
         self.state = self.filter_observations(self.state)
 
         # only keep user input which is actually connected to an agent action
+        decide_start_time = time.perf_counter()
         usrinput = self.filter_user_input(user_input)
 
         # Call the method that decides on an action
         action, action_kwargs = self.decide_on_action(self.state, usrinput)
+        self.decision_durations = (decide_start_time - filter_start_time, time.perf_counter() - decide_start_time)
 
         # Store the action so in the next call the agent still knows what it
         # did.
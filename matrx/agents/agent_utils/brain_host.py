@@ -0,0 +1,359 @@
+import functools
+import multiprocessing
+import threading
+import traceback
+
+from matrx.agents.agent_brain import AgentBrain
+from matrx.agents.agent_types.human_agent import HumanAgentBrain
+from matrx.agents.agent_utils.state import State
+from matrx.objects.env_object import FrozenProperties
+
+
+class BrainHost:
+    """ A worker process in which one or more agent brains are hosted.
+
+    A `BrainHost` is used through :class:`RemoteAgentBrain`, which wraps an agent brain and forwards all calls the
+    GridWorld makes to that brain to a worker process. Several brains can share a single host, in which case they are
+    handled one at a time by that host's process.
+
+    A host handles one call at a time. To let brains in different hosts decide at the same time, combine multiple hosts
+    with the `decision_threads` setting of the :class:`matrx.world_builder.WorldBuilder`.
+
+    The worker process is a daemon process, so it is stopped when the main process ends. Use :meth:`stop` to stop it
+    earlier. As brains may be reused for multiple worlds of the same builder, hosts are not stopped when a world ends.
+    """
+
+    def __init__(self, start_method=None):
+        """ Starts the worker process of this host.
+
+        Parameters
+        ----------
+        start_method : str (optional, default None)
+            The `multiprocessing` start method used to start the worker process, e.g. "fork" or "spawn". When None, the
+            default of the platform is used. With "spawn", the brain classes should be importable from a module.
+        """
+        context = multiprocessing.get_context(start_method)
+        self.__connection, worker_connection = context.Pipe()
+        self.__process = context.Process(target=_run_worker, args=(worker_connection,), daemon=True)
+        self.__process.start()
+        worker_connection.close()
+
+        # Calls of different threads to the same host are handled one at a time
+        self.__lock = threading.Lock()
+
+        self.__callbacks = {}  # brain key (keys) and its callback to check if an action is possible (values)
+        self.__nr_brains = 0
+
+    @property
+    def is_alive(self):
+        """ Whether the worker process of this host is still running. """
+        return self.__process.is_alive()
+
+    def stop(self):
+        """ Stops the worker process of this host. Its hosted brains can no longer be used. """
+        if self.__process.is_alive():
+            with self.__lock:
+                self.__connection.send(("stop",))
+            self.__process.join()
+        self.__connection.close()
+
+    def _add_brain(self, agent_brain):
+        """ Sends the given brain to the worker process, and returns the key with which it can be called. """
+        key = self.__nr_brains
+        self.__nr_brains += 1
+        with self.__lock:
+            self.__connection.send(("add", key, agent_brain))
+        return key
+
+    def _set_callback(self, key, callback_is_action_possible):
+        """ Sets the GridWorld callback the hosted brain with the given key uses to check if an action is possible. """
+        self.__callbacks[key] = callback_is_action_possible
+
+    def _call(self, key, method, args=(), kwargs=None):
+        """ Calls a method of a hosted brain and returns its result. Any callback the brain makes to the GridWorld while
+        handling the call is performed here.
+        """
+        with self.__lock:
+            self.__connection.send(("call", key, method, args, kwargs, True))
+            while True:
+                reply = self.__connection.recv()
+                if reply[0] == "result":
+                    return reply[1]
+                elif reply[0] == "callback":
+                    self.__perform_callback(*reply[1:])
+                else:
+                    raise RuntimeError(f"The agent brain with key {key} in a BrainHost process raised an exception "
+                                       f"during {method}:\n{reply[1]}")
+
+    def _post(self, key, method, args=(), kwargs=None):
+        """ Calls a method of a hosted brain without waiting for its result. Any exception is raised by the next call
+        that waits for a result.
+        """
+        with self.__lock:
+            self.__connection.send(("call", key, method, args, kwargs, False))
+
+    def __perform_callback(self, key, args):
+        try:
+            result = ("callback_result", self.__callbacks[key](*args))
+        except Exception:
+            result = ("callback_error", traceback.format_exc())
+        self.__connection.send(result)
+
+
+class RemoteAgentBrain(AgentBrain):
+    """ An agent brain that lives in the worker process of a :class:`BrainHost`.
+
+    The GridWorld uses this brain as any other. It forwards all calls to the wrapped brain in the worker process, so the
+    wrapped brain itself needs no changes. For example::
+
+        host = BrainHost()
+        builder.add_agent(location, RemoteAgentBrain(MyAgentBrain(), host=host))
+
+    States are sent as deltas: per object only the properties that changed since the previous state sent to the same
+    brain are sent, and the same holds for the filtered state that is returned. Objects whose properties are still the
+    same shared snapshot are skipped without comparing or serializing them. The property dictionaries of unchanged
+    objects are reused by the hosted brain between ticks, so it should not change them in place.
+
+    The wrapped brain is sent to the worker process when this brain is created, so any later change to it is not seen
+    by the hosted brain. Human agents need the user input of the main process and can not be hosted.
+    """
+
+    def __init__(self, agent_brain, host=None):
+        """ Sends the given brain to the (given) host.
+
+        Parameters
+        ----------
+        agent_brain : AgentBrain
+            The brain to host. It is pickled, so it should not (yet) reference unpicklable objects such as locks.
+        host : BrainHost (optional, default None)
+            The host of the brain. When None, a new host is started for this brain alone.
+
+        Raises
+        ------
+        ValueError
+            When the given brain is not an AgentBrain, or when it is a HumanAgentBrain.
+        """
+        if not isinstance(agent_brain, AgentBrain):
+            raise ValueError(f"The given agent_brain is not of type {AgentBrain.__name__} but of type "
+                             f"{agent_brain.__class__.__name__}.")
+        if isinstance(agent_brain, HumanAgentBrain):
+            raise ValueError(f"The {HumanAgentBrain.__name__} {agent_brain.__class__.__name__} can not be hosted in a "
+                             f"{BrainHost.__name__}, as it needs the user input of the main process.")
+
+        super().__init__(memorize_for_ticks=agent_brain.memorize_for_ticks)
+
+        # The class of the hosted brain, used instead of this class for the agent's class inheritance
+        self.brain_class = agent_brain.__class__
+        self.needs_perception_when_busy = agent_brain.needs_perception_when_busy
+
+        self.host = host if host is not None else BrainHost()
+        self.__key = self.host._add_brain(agent_brain)
+
+        self.__sent_state = {}  # obj IDs (keys) and the properties last sent to the hosted brain (values)
+        self.__received_state = {}  # the last filtered state received from the hosted brain
+
+    def _factory_initialise(self, agent_name, agent_id, action_set, sense_capability, agent_properties,
+                            rnd_seed, callback_is_action_possible):
+        super()._factory_initialise(agent_name=agent_name, agent_id=agent_id, action_set=action_set,
+                                    sense_capability=sense_capability, agent_properties=agent_properties,
+                                    rnd_seed=rnd_seed, callback_is_action_possible=callback_is_action_possible)
+
+        # A new world starts, so all objects are sent again
+        self.__sent_state = {}
+        self.__received_state = {}
+
+        self.host._set_callback(self.__key, callback_is_action_possible)
+        self.host._call(self.__key, "_factory_initialise",
+                        kwargs={"agent_name": agent_name, "agent_id": agent_id, "action_set": action_set,
+                                "sense_capability": sense_capability, "agent_properties": agent_properties,
+                                "rnd_seed": rnd_seed})
+
+    def initialize(self):
+        self.host._call(self.__key, "initialize")
+
+    def create_context_menu_for_other(self, agent_id_who_clicked, clicked_object_id, click_location):
+        return self.host._call(self.__key, "create_context_menu_for_other",
+                               args=(agent_id_who_clicked, clicked_object_id, click_location))
+
+    def _get_action(self, state, agent_properties, agent_id):
+        changed, order = self.__encode_state(state)
+        filtered_state, agent_properties, action, action_kwargs, decision_durations = \
+            self.host._call(self.__key, "_get_action", args=(changed, order, agent_properties, agent_id))
+
+        self.agent_properties = agent_properties
+        self.decision_durations = decision_durations
+        self.previous_action = action
+
+        return self.__decode_state(filtered_state), agent_properties, action, action_kwargs
+
+    def _fetch_state(self, state):
+        changed, order = self.__encode_state(state)
+        filtered_state = self.host._call(self.__key, "_fetch_state", args=(changed, order))
+        return self.__decode_state(filtered_state)
+
+    def _get_log_data(self):
+        return self.host._call(self.__key, "_get_log_data")
+
+    def _set_action_result(self, action_result):
+        self.previous_action_result = action_result
+        self.host._post(self.__key, "_set_action_result", args=(action_result,))
+
+    def _get_messages(self, all_agent_ids):
+        # The agent IDs may be a dictionary view, which can not be pickled
+        return self.host._call(self.__key, "_get_messages", args=(list(all_agent_ids),))
+
+    def _set_messages(self, messages=None):
+        self.host._post(self.__key, "_set_messages", args=(messages,))
+
+    def __encode_state(self, state):
+        changed, order, self.__sent_state = _encode_state(state.as_dict(), self.__sent_state)
+        return changed, order
+
+    def __decode_state(self, encoded_state):
+        # The filtered state is kept as this brain's state, so it can be inspected as for any other brain
+        if encoded_state is None:
+            return None
+        self.__received_state = _decode_state(self.__received_state, *encoded_state)
+        self._state.state_update(self.__received_state)
+        return self._state
+
+
+def _encode_state(state_dict, previous):
+    """ Encodes a state dictionary as the difference with the previously encoded one.
+
+    Objects whose properties are the same dictionary as before are skipped. This holds for all objects that did not
+    change, as their properties are snapshots shared between states (see `FrozenProperties`), so these are neither
+    compared nor serialized. For all other objects only the properties that differ from before are encoded.
+
+    Returns a dictionary with for each new or changed object whether its properties are `FrozenProperties`, its new or
+    changed properties and the names of its removed properties, the list of all object IDs in the state (or None when
+    these are the same and in the same order as before), and the properties of all objects to compare the next state
+    with.
+    """
+    changed = {}
+    sent = {}
+    for obj_id, properties in state_dict.items():
+        is_frozen = isinstance(properties, FrozenProperties)
+        # Properties that are not frozen may be changed in place later on, so we keep a copy of them
+        sent[obj_id] = properties if is_frozen else dict(properties)
+
+        prev_properties = previous.get(obj_id)
+        if prev_properties is properties:
+            continue
+        prev_properties = {} if prev_properties is None else prev_properties
+        new_properties = {name: value for name, value in properties.items()
+                          if name not in prev_properties or not _is_same(value, prev_properties[name])}
+        removed = tuple(name for name in prev_properties.keys() if name not in properties)
+        if len(new_properties) > 0 or len(removed) > 0 or is_frozen != isinstance(prev_properties, FrozenProperties):
+            changed[obj_id] = (is_frozen, new_properties, removed)
+
+    order = None if list(sent.keys()) == list(previous.keys()) else list(sent.keys())
+    return changed, order, sent
+
+
+def _is_same(value, other):
+    """ Returns whether two property values are the same, so the value does not need to be sent again. """
+    if value is other:
+        return True
+    try:
+        return type(value) is type(other) and bool(value == other)
+    except Exception:  # e.g. numpy arrays, which have no single truth value
+        return False
+
+
+def _decode_state(previous, changed, order):
+    """ Decodes a state dictionary from its difference with the previously decoded one. Returns a new dictionary, as
+    the previous one may be shared with the state it was given to. """
+    decoded = previous.copy()
+    for obj_id, (is_frozen, new_properties, removed) in changed.items():
+        properties = {**decoded.get(obj_id, {}), **new_properties}
+        for name in removed:
+            del properties[name]
+        decoded[obj_id] = FrozenProperties(properties) if is_frozen else properties
+    if order is None:
+        return decoded
+    return {obj_id: decoded[obj_id] for obj_id in order}
+
+
+def _run_worker(connection):
+    """ The main loop of the worker process of a BrainHost. """
+    _BrainWorker(connection).run()
+
+
+class _BrainWorker:
+    """ Handles the calls to the brains hosted in a worker process. """
+
+    def __init__(self, connection):
+        self.__connection = connection
+        self.__brains = {}  # brain key (keys) and the hosted brain (values)
+        self.__received_states = {}  # brain key (keys) and the last state it received (values)
+        self.__sent_states = {}  # brain key (keys) and the properties of its last filtered state (values)
+        self.__error = None  # the traceback of an exception raised during a call without reply
+
+    def run(self):
+        while True:
+            request = self.__connection.recv()
+            if request[0] == "stop":
+                break
+            elif request[0] == "add":
+                _, key, agent_brain = request
+                self.__brains[key] = agent_brain
+            elif request[0] == "call":
+                _, key, method, args, kwargs, reply = request
+                try:
+                    result = ("result", self.__call(key, method, args, kwargs or {}))
+                except Exception:
+                    result = ("error", traceback.format_exc())
+
+                if result[0] == "error" and not reply:
+                    self.__error = self.__error if self.__error is not None else result[1]
+                if reply:
+                    if self.__error is not None:
+                        result = ("error", self.__error)
+                        self.__error = None
+                    self.__connection.send(result)
+        self.__connection.close()
+
+    def __call(self, key, method, args, kwargs):
+        agent_brain = self.__brains[key]
+
+        if method == "_factory_initialise":
+            self.__received_states[key] = {}
+            self.__sent_states[key] = {}
+            kwargs["callback_is_action_possible"] = functools.partial(self.__is_action_possible, key)
+            return agent_brain._factory_initialise(**kwargs)
+
+        elif method == "_get_action":
+            changed, order, agent_properties, agent_id = args
+            state = self.__decode_state(key, changed, order, agent_brain.agent_id)
+            filtered_state, agent_properties, action, action_kwargs = \
+                agent_brain._get_action(state=state, agent_properties=agent_properties, agent_id=agent_id)
+            return (self.__encode_state(key, filtered_state), agent_properties, action, action_kwargs,
+                    agent_brain.decision_durations)
+
+        elif method == "_fetch_state":
+            changed, order = args
+            state = self.__decode_state(key, changed, order, agent_brain.agent_id)
+            return self.__encode_state(key, agent_brain._fetch_state(state))
+
+        return getattr(agent_brain, method)(*args, **kwargs)
+
+    def __decode_state(self, key, changed, order, agent_id):
+        self.__received_states[key] = _decode_state(self.__received_states[key], changed, order)
+        state = State(own_id=agent_id)
+        state.state_update(self.__received_states[key])
+        return state
+
+    def __encode_state(self, key, filtered_state):
+        if filtered_state is None:
+            return None
+        changed, order, self.__sent_states[key] = _encode_state(filtered_state.as_dict(), self.__sent_states[key])
+        return changed, order
+
+    def __is_action_possible(self, key, *args):
+        # Asks the main process to check the action with the GridWorld, which replies before the call continues
+        self.__connection.send(("callback", key, args))
+        reply = self.__connection.recv()
+        if reply[0] == "callback_error":
+            raise RuntimeError(f"Checking whether an action is possible raised an exception:\n{reply[1]}")
+        return reply[1]
@@ -1,8 +1,8 @@
 import copy
 from collections.abc import Iterable, MutableMapping
 
-from matrx import utils
 from matrx.objects import Door, AreaTile, Wall
+from matrx.objects.env_object import FrozenProperties
 import numpy as np
 
 
@@ -17,8 +17,16 @@ class State(MutableMapping):
         self.__me = None
         self.__own_id = own_id
         self.__state_dict = {}
+        self.__is_shared = False  # whether the state dict may be shared with others, then it is copied before changing
         self.__prev_state_dict = {}
         self.__decays = {}
+        self.__type_index = None  # class names (keys) and a list of IDs of objects of that class (values), lazily built
+        self.__property_index = {}  # property names (keys) and their inverted index (values), see __get_property_index
+        self.__positions = None  # object IDs (keys) and their position in the state (values), lazily built
+        self.__coordinate_index = None  # the locations of all objects, lazily built, see __get_coordinate_index
+        self.__traverse_map = None  # the traverse map of this state, lazily built, see get_traverse_map
+        self.__traverse_counts = (None, None, None)  # kept to update incrementally, see __count_intraversable
+        self.__distance_map = None  # the own location and grid shape (as key) and the distance map from that location
 
     def state_update(self, state_dict):
 
@@ -30,11 +38,14 @@ class State(MutableMapping):
             else:
                 raise ValueError(f"A State object can only be updated with a dictionary.")
 
-        # If decay does not matter, we simply use the given dictionary
+        # If decay does not matter, we simply use the given dictionary. It is not copied, but shared with whoever gave
+        # it until this state changes it (see __own_state_dict), so it should not be changed after it is given.
         if self.__decay_val <= 0.0:
             # Set the previous and new state
-            self.__prev_state_dict = self.__state_dict.copy()
-            self.__state_dict = state_dict.copy()
+            self.__prev_state_dict = self.__state_dict
+            self.__state_dict = state_dict
+            self.__is_shared = True
+            self.__reset_indices()
 
             # Set the "me"
             self.__me = self.get_self()
@@ -42,9 +53,9 @@ class State(MutableMapping):
             # Return self
             return self
 
-        # Else: decay does matter so we need to handle knowledge decay
-        prev_state = self.__state_dict.copy()
-        state = state_dict.copy()
+        # Else: decay does matter so we need to handle knowledge decay. Both states are only read.
+        prev_state = self.__state_dict
+        state = state_dict
 
         # Get the ids of all newly perceived objects
         new_ids = set(state.keys()) - set(prev_state.keys())
@@ -101,6 +112,8 @@ class State(MutableMapping):
         # Set the new state
         self.__prev_state_dict = self.__state_dict
         self.__state_dict = new_state
+        self.__is_shared = False
+        self.__reset_indices()
 
         # Set the "me"
         self.__me = self.get_self()
@@ -219,7 +232,9 @@ class State(MutableMapping):
         raise ValueError("You cannot set items to the state, use state.state_update(...) instead.")
 
     def __delitem__(self, key):
+        self.__own_state_dict()
         del self.__state_dict[key]
+        self.__reset_indices()
 
     def __iter__(self):
         return iter(self.__state_dict)
@@ -234,19 +249,77 @@ class State(MutableMapping):
         raise ValueError("You cannot update the state, use state.state_update(...) instead.")
 
     def copy(self):
-        return copy.deepcopy(self)
+        """ Returns a copy of this state.
+
+        The copy shares the objects and their properties with this state, and only copies them when either state
+        changes them (copy-on-write). Hence copying is cheap, also for many copies of large states. The properties of
+        the objects are shared as they can not be changed in place (see `FrozenProperties`), use `change_property` to
+        change them in a single state.
+        """
+        state = copy.copy(self)
+        self.__is_shared = state.__is_shared = True
+        state.__decays = self.__decays.copy()
+        state.__reset_indices()
+        return state
 
     def pop(self, obj_id):
+        self.__own_state_dict()
+        self.__reset_indices()
         return self.__state_dict.pop(obj_id)
 
     def remove(self, obj_id):
+        self.__own_state_dict()
         self.__state_dict.pop(obj_id)
+        self.__reset_indices()
+
+    def change_property(self, obj_id, property_name, property_value):
+        """ Changes (or adds) a property of an object in this state only. The object itself, and any other state in
+        which it occurs, are not changed.
+
+        Parameters
+        ----------
+        obj_id : str
+            The ID of the object in this state.
+        property_name : str
+            The name of the property.
+        property_value
+            The new value of the property.
+
+        Returns
+        -------
+        dict
+            The new properties of the object.
+        """
+        self.__own_state_dict()
+        obj = self.__state_dict[obj_id]
+        properties = dict(obj)
+        properties[property_name] = property_value
+        if isinstance(obj, FrozenProperties):
+            properties = FrozenProperties(properties)
+        self.__state_dict[obj_id] = properties
+        self.__reset_indices()
+
+        if obj_id == self.__own_id:
+            self.__me = properties
+
+        return properties
 
     def as_dict(self):
+        """ Returns the dictionary of this state, object IDs as keys. It may be shared with other states (see `copy`),
+        so it should not be changed. """
         return self.__state_dict
 
     def _add_world_info(self, world_info_dict):
+        self.__own_state_dict()
         self.__state_dict["World"] = world_info_dict
+        self.__reset_indices()
+
+    def __own_state_dict(self):
+        # Copies the state dict before this state changes it, if it may be shared with others (copy-on-write). Only the
+        # dictionary is copied, the objects in it are still shared.
+        if self.__is_shared:
+            self.__state_dict = dict(self.__state_dict)
+            self.__is_shared = False
 
     ###############################################
     #     Some helpful getters for the state      #
@@ -266,17 +339,55 @@ class State(MutableMapping):
             self.remove(obj['obj_id'])
 
     def get_of_type(self, obj_type):
-        return self.get_with_property({"class_inheritance": obj_type}, combined=False)
+        # Class names (or a list of them) are looked up in the type index, anything else is handled by the generic
+        # property search
+        if isinstance(obj_type, str):
+            obj_types = [obj_type]
+        elif State.__is_iterable(obj_type) and all(isinstance(t, str) for t in obj_type):
+            obj_types = list(obj_type)
+        else:
+            return self.get_with_property({"class_inheritance": obj_type}, combined=False)
+
+        if self.__type_index is None:
+            self.__type_index = self.__build_type_index()
+
+        found = [self.__state_dict[obj_id] for t in obj_types for obj_id in self.__type_index.get(t, [])]
+
+        # If nothing was found, we return None just as the property search does
+        if not found:
+            found = None
+
+        return found
+
+    def get_room_registry(self):
+        """ Returns the rooms of the world as plain data (see `RoomRegistry.room_info`), None if the world info in this
+        state has none. These are the rooms formed by the objects the WorldBuilder created with a room name (e.g.
+        those of `WorldBuilder.add_room`), with the room names as keys and for each room its bounds ("top_left" and
+        "bottom_right") and the IDs of its objects ("object_ids"), walls ("wall_ids"), doors ("door_ids") and area
+        tiles ("area_ids"). The room helpers of this state look up the objects of these rooms by their ID, leaving out
+        those that are not in this state (e.g. as the agent does not perceive them). Rooms that are not in the registry
+        are found by searching the state for objects with their room name. """
+        world_info = self.__state_dict.get('World')
+        if world_info is None:
+            return None
+        return world_info.get('rooms')
 
     def get_room(self, room_name):
-        return self.get_with_property({"room_name": room_name}, combined=False)
+        room_objs = self.__find_room(room_name)
+        if len(room_objs) == 0:
+            return None
+        return room_objs
 
     def get_all_room_names(self):
+        # The registered rooms of which any object is in this state
+        registry = self.get_room_registry()
+        if registry is not None:
+            return [room_name for room_name, room in registry.items()
+                    if any(obj_id in self.__state_dict for obj_id in room["object_ids"])]
+
+        # Without a registry, the room names of all objects with one, in the order of the state
         rooms = self.get_with_property("room_name", combined=False)
-        if rooms is None:
-            return []
-        else:
-            return list({obj['room_name'] for obj in rooms})
+        return [] if rooms is None else list(dict.fromkeys(obj['room_name'] for obj in rooms))
 
     def get_room_objects(self, room_name):
         """ This function finds all objects in a rectengular room. 
@@ -285,6 +396,8 @@ class State(MutableMapping):
         property (such as walls, doors, and areatiles), getting their locations, 
         and finding any other objects on those locations. 
         All objects are returned, including walls, doors, and areatiles.
+
+        When the room is in the room registry (see `get_room_registry`), its bounds are taken from there.
         """
         # Get all room objects with the {"room_name":room_name} property
         room_objs = self.get_room(room_name)
@@ -292,19 +405,16 @@ class State(MutableMapping):
         if room_objs is None:  # No room with room_name was found
             return None
 
-        # get locations of all room objects 
-        room_locations = [obj['location'] for obj in room_objs]
-
-        top_left = room_locations[0]
-        bottom_right = room_locations[0]
-        for loc in room_locations:
-            if loc[0] < top_left[0] or loc[1] < top_left[1]:
-                top_left = loc 
-            elif loc[0] > bottom_right[0] or loc[1] > bottom_right[1]:
-                bottom_right = loc
+        # get the bounds of the registered room, or of all room objects
+        room = self.__get_registered_room(room_name)
+        if room is not None:
+            top_left, bottom_right = room["top_left"], room["bottom_right"]
+        else:
+            xs = [obj['location'][0] for obj in room_objs if 'location' in obj]
+            ys = [obj['location'][1] for obj in room_objs if 'location' in obj]
+            top_left, bottom_right = (min(xs), min(ys)), (max(xs), max(ys))
+        content = self.get_objects_in_area(top_left=top_left, bottom_right=bottom_right)
 
-        content = self.get_objects_in_area(top_left=top_left, width=5, height=6)#bottom_right=bottom_right)
-        
         return content
 
     def get_objects_in_area(self, top_left, width=None, height=None, bottom_right=None):
@@ -315,24 +425,31 @@ class State(MutableMapping):
                 raise Exception("Either a bottom_right coordinate, or width and height are required.")
             else:
                 bottom_right = (top_left[0] + width, top_left[1] + height)
-        
-        # Check if object within area
-        def within_area(obj):
-            if "location" not in obj.keys():
-                return None 
-            # object is within the room
-            elif obj['location'][0] >= top_left[0] and obj['location'][1] >= top_left[1] and obj['location'][0] <= bottom_right[0] and obj['location'][1] <= bottom_right[1]:
-                return obj
-            else: 
-                return None 
-
-        # Filter out all objects not within the room
-        objs_in_area = map(within_area, self.__state_dict.values())
-        objs_in_area = [c for c in objs_in_area if c is not None]
+
+        # Select all objects within the area (including its borders) at once from the coordinate index
+        index = self.__get_coordinate_index()
+        x, y = index["x"], index["y"]
+        within_area = (x >= top_left[0]) & (y >= top_left[1]) & (x <= bottom_right[0]) & (y <= bottom_right[1])
+        objs_in_area = [self.__state_dict[index["ids"][row]] for row in np.flatnonzero(within_area)]
 
         return objs_in_area
 
+    def get_objects_at(self, location):
+        """ Find all objects at the given location, in the order of the state. Returns an empty list if there are none.
+        """
+        obj_ids = self.__get_coordinate_index()["cells"].get((location[0], location[1]), [])
+        return [self.__state_dict[obj_id] for obj_id in obj_ids]
+
     def get_room_doors(self, room_name):
+        room_objs = self.get_room(room_name)
+        if room_objs is None:  # No room was found with the given room name
+            return None
+
+        # The registered doors of the room that are in this state
+        room = self.__get_registered_room(room_name)
+        if room is not None:
+            return [self.__state_dict[obj_id] for obj_id in room["door_ids"] if obj_id in self.__state_dict]
+
         # Locate method to identify doors of the right room
         def is_content(obj):
             if 'class_inheritance' in obj.keys():
@@ -342,10 +459,6 @@ class State(MutableMapping):
             else:  # the object is not a Door
                 return None
 
-        room_objs = self.get_room(room_name)
-        if room_objs is None:  # No room was found with the given room name
-            return None
-
         # Filter out all doors
         doors = map(is_content, room_objs)
         doors = [c for c in doors if c is not None]
@@ -374,13 +487,9 @@ class State(MutableMapping):
         return team_members
 
     def get_closest_objects(self):
-        objs = self.__find_object(props='location', combined=True)
-        if objs is None:
-            return None
-
-        objs = np.array(objs)
-        # Remove itself, since the agent self is always closest...
-        other_objects = np.array([o for o in objs if o['obj_id'] != self.__own_id])
+        # All objects with a location, apart from itself since the agent self is always closest...
+        index = self.__get_coordinate_index()
+        other_objects = [self.__state_dict[obj_id] for obj_id in index["ids"] if obj_id != self.__own_id]
         closest_objects = self.__get_closest(other_objects)
         return closest_objects
 
@@ -389,9 +498,8 @@ class State(MutableMapping):
         if objs is None:
             return None
 
-        objs = np.array(objs)
         # Remove itself, since the agent self is always closest...
-        other_objects = np.array([o for o in objs if o['obj_id'] != self.__own_id])
+        other_objects = [o for o in objs if o['obj_id'] != self.__own_id]
         closest_objects = self.__get_closest(other_objects)
         return closest_objects
 
@@ -404,7 +512,6 @@ class State(MutableMapping):
         if objs is None:
             return None
 
-        objs = np.array(objs)
         closest_objects = self.__get_closest(objs)
         return closest_objects
 
@@ -414,41 +521,79 @@ class State(MutableMapping):
             return None
 
         # Remove itself, since the agent self is always closest...
-        other_agents = np.array([a for a in agents if a['obj_id'] != self.__own_id])
+        other_agents = [a for a in agents if a['obj_id'] != self.__own_id]
         closest_agents = self.__get_closest(other_agents)
         return closest_agents
 
     def get_self(self):
-        me = self.__find_object(props={'obj_id': self.__own_id}, combined=True)[0]
+        # The agent's own object is stored under its ID, otherwise we search for it
+        me = self.__state_dict.get(self.__own_id)
+        if me is None or me.get('obj_id') != self.__own_id:
+            me = self.__find_object(props={'obj_id': self.__own_id}, combined=True)[0]
         return me
 
     ###############################################
     # Some higher level abstractions of the state #
     ###############################################
-    def get_traverse_map(self):
-        width, length = self.get_world_info()['grid_shape']
-        coords = [(x, y) for x in range(width) for y in range(length)]
-        traverse_map = {c: True for c in coords}
-        intrav_objs = self.get_with_property(props={'is_traversable': False, 'location': (None, )}, combined=False)
-        for o in intrav_objs:
-            traverse_map[(o['location'][0], o['location'][1])] = False
+    def get_traverse_map(self, as_dict=False):
+        """ Returns which locations of the world are traversable, i.e. do not contain an intraversable object that is in
+        this state.
+
+        The map is computed once per version of this state. When the state is updated, it is updated incrementally from
+        the previous map with only the objects that changed, so it is cheap to obtain every tick.
+
+        Parameters
+        ----------
+        as_dict : bool (optional, default False)
+            Whether to return the map as a dictionary with an (x, y) tuple of each location as key.
+
+        Returns
+        -------
+        ndarray or dict
+            A read-only boolean array of the shape of the world, indexed as `traverse_map[x, y]`. Or, when `as_dict` is
+            True, a dictionary with the same booleans per location.
+        """
+        if self.__traverse_map is None:
+            counts = self.__count_intraversable()
+            self.__traverse_map = counts == 0
+            self.__traverse_map.flags.writeable = False
+
+        if as_dict:
+            return self.__map_as_dict(self.__traverse_map)
+        return self.__traverse_map
+
+    def get_distance_map(self, as_dict=False):
+        """ Returns the (euclidean) distance from the location of the agent to each location of the world.
+
+        The map is computed once for each location of the agent and reused as long as the agent stays there.
 
-        return traverse_map
+        Parameters
+        ----------
+        as_dict : bool (optional, default False)
+            Whether to return the map as a dictionary with an (x, y) tuple of each location as key.
 
-    def get_distance_map(self):
+        Returns
+        -------
+        ndarray or dict
+            A read-only float array of the shape of the world, indexed as `distance_map[x, y]`. Or, when `as_dict` is
+            True, a dictionary with the same distances per location.
+        """
         width, length = self.get_world_info()['grid_shape']
-        coords = [(x, y) for x in range(width) for y in range(length)]
         if self.__me is not None:
             loc = self.__me['location']
         else:
             loc = self.get_self()['location']
 
-        def distance(coord):
-            return utils.get_distance(loc, coord)
+        key = (tuple(loc), width, length)
+        if self.__distance_map is None or self.__distance_map[0] != key:
+            xs, ys = np.meshgrid(np.arange(width), np.arange(length), indexing="ij")
+            dist_map = np.sqrt((xs - loc[0]) ** 2 + (ys - loc[1]) ** 2)
+            dist_map.flags.writeable = False
+            self.__distance_map = (key, dist_map)
 
-        dist_map = {c: distance(c) for c in coords}
-
-        return dist_map
+        if as_dict:
+            return self.__map_as_dict(self.__distance_map[1])
+        return self.__distance_map[1]
 
     def apply_occlusion(self):
         raise NotImplemented("Field of view occlusion is not yet implemented.")
@@ -465,17 +610,122 @@ class State(MutableMapping):
         else:
             my_loc = self.get_self()['location']
 
-        def distance(x):
-            loc = x['location']
-            return utils.get_distance(my_loc, loc)
-
-        dists = np.array(list(map(distance, objs)))
-        closest_idx = np.where(dists == dists.min())[0]
-        closest_objects = objs[closest_idx]
-        closest_objects = list(closest_objects)
+        # Compare the squared distances of all objects at once, using their locations in the coordinate index
+        index = self.__get_coordinate_index()
+        rows = np.array([index["rows"][obj['obj_id']] for obj in objs])
+        diff_x = index["x"][rows] - my_loc[0]
+        diff_y = index["y"][rows] - my_loc[1]
+        dists = diff_x * diff_x + diff_y * diff_y
+        closest_objects = [objs[idx] for idx in np.flatnonzero(dists == dists.min())]
 
         return closest_objects
 
+    def __get_coordinate_index(self):
+        # Returns the coordinate index of the state, built on its first use after the state changed. It contains the
+        # IDs of all objects with a location in the order of the state ("ids"), the row of each of them ("rows") in the
+        # arrays with their x ("x") and y ("y") coordinates, and the IDs of the objects at each location ("cells").
+        if self.__coordinate_index is not None:
+            return self.__coordinate_index
+
+        ids, xs, ys, cells = [], [], [], {}
+        for obj_id, obj in self.__state_dict.items():
+            if "location" not in obj:
+                continue
+            x, y = obj["location"][0], obj["location"][1]
+            ids.append(obj_id)
+            xs.append(x)
+            ys.append(y)
+            cells.setdefault((x, y), []).append(obj_id)
+
+        self.__coordinate_index = {"ids": ids, "rows": {obj_id: row for row, obj_id in enumerate(ids)},
+                                   "x": np.array(xs, dtype=int), "y": np.array(ys, dtype=int), "cells": cells}
+        return self.__coordinate_index
+
+    def __get_registered_room(self, room_name):
+        # Returns the room with the given name from the room registry, None if there is no registry or it does not have
+        # that room.
+        registry = self.get_room_registry()
+        if registry is None or not isinstance(room_name, str):
+            return None
+        return registry.get(room_name)
+
+    def __find_room(self, room_name):
+        # Finds the objects of a room. Those of a registered room are looked up by their ID, in the order in which they
+        # were created. Otherwise these are all objects with the room name in the order of the state, which are looked
+        # up in the property index.
+        room = self.__get_registered_room(room_name)
+        if room is not None:
+            return [self.__state_dict[obj_id] for obj_id in room["object_ids"] if obj_id in self.__state_dict]
+
+        room_objs = self.get_with_property({"room_name": room_name}, combined=False)
+        return [] if room_objs is None else room_objs
+
+    def __reset_indices(self):
+        # The indices are built for the current state when first needed, so they are discarded whenever it changes
+        self.__type_index = None
+        self.__property_index = {}
+        self.__positions = None
+        self.__coordinate_index = None
+        self.__traverse_map = None
+
+    def __count_intraversable(self):
+        # Returns the number of intraversable objects at each location, indexed as [x, y]. The counts are kept, together
+        # with the objects they were counted from, such that for a next version of this state only the objects that
+        # changed are recounted. Unchanged objects are recognized by their (read-only) properties being the same.
+        width, length = self.get_world_info()['grid_shape']
+        counts, source, intraversable = self.__traverse_counts
+
+        changed_ids = None
+        if counts is not None and counts.shape == (width, length):
+            changed_ids = [obj_id for obj_id, obj in self.__state_dict.items()
+                           if source.get(obj_id) is not obj or not isinstance(obj, FrozenProperties)]
+            changed_ids.extend(obj_id for obj_id in intraversable if obj_id not in self.__state_dict)
+            # With many changes, counting everything anew is just as fast
+            if len(changed_ids) > len(self.__state_dict) // 2:
+                changed_ids = None
+
+        if changed_ids is None:
+            counts = np.zeros((width, length), dtype=int)
+            intraversable = {}
+            changed_ids = self.__state_dict.keys()
+        else:
+            # The counts may be shared with copies of this state, so they are only changed as a copy
+            counts = counts.copy()
+            intraversable = intraversable.copy()
+
+        for obj_id in changed_ids:
+            if obj_id in intraversable:
+                counts[intraversable.pop(obj_id)] -= 1
+            obj = self.__state_dict.get(obj_id)
+            if obj is None or 'is_traversable' not in obj or 'location' not in obj \
+                    or not self.__matches(obj['is_traversable'], False):
+                continue
+            x, y = obj['location'][0], obj['location'][1]
+            if 0 <= x < width and 0 <= y < length:
+                intraversable[obj_id] = (x, y)
+                counts[x, y] += 1
+
+        self.__traverse_counts = (counts, dict(self.__state_dict), intraversable)
+        return counts
+
+    @staticmethod
+    def __map_as_dict(location_map):
+        # Returns a map indexed as [x, y] as a dictionary with (x, y) tuples as keys, with the values as Python types
+        width, length = location_map.shape
+        values = location_map.tolist()
+        return {(x, y): values[x][y] for x in range(width) for y in range(length)}
+
+    def __build_type_index(self):
+        # Maps each class name in the 'class_inheritance' of the objects to the IDs of those objects, in the order of
+        # the state. It is built once per state and reused for every `get_of_type` call until the state changes.
+        type_index = {}
+        for obj_id, obj in self.__state_dict.items():
+            if not isinstance(obj, dict):
+                continue
+            for class_name in set(obj.get("class_inheritance", [])):
+                type_index.setdefault(class_name, []).append(obj_id)
+        return type_index
+
     def __find_object(self, props, combined):
         # Make sure that props is a dict, with as keys the property names and as values a tuple of allowable property
         # values (which can be (None,) if no value is specified).
@@ -556,27 +806,97 @@ class State(MutableMapping):
         return found
 
     def __find(self, prop_name, prop_value=None):
-        # A local function that identifies whether a given obj_id-obj pair has the requested property name and, if
-        # given, the right property value. Is used in the map method to find all object that adhere to it.
-        def locate(id_obj_pair):
-            obj = id_obj_pair[1]
-
-            # The object is found when it has the property and the value is none, or when it has the property and the
-            # requested value is the value of that property OR is in that value of that property (e.g. as substring or
-            # list item).
-            if prop_name in obj:
-                # value given and equals that in the object
-                if prop_value is None or prop_value == obj[prop_name]:
-                    return obj
-                # value given and is in that object's property (e.g. as substring of item in list)
-                elif prop_value is not None and isinstance(obj[prop_name], Iterable) and prop_value in obj[prop_name]:
-                    return obj
-            return None
+        # Finds all objects with the given property name and, if given, the right property value, in the order of the
+        # state. The object IDs are looked up in the inverted index of that property (see __get_property_index).
+        index = self.__get_property_index(prop_name)
+        if prop_value is None:
+            found_ids = index["ids"]
+        else:
+            try:
+                found_ids = index["found"].get(prop_value)
+                if found_ids is None:
+                    found_ids = self.__find_in_index(index, prop_name, prop_value)
+                    index["found"][prop_value] = found_ids
+            except TypeError:  # the requested value is not hashable, so we check all objects with the property
+                found_ids = [obj_id for obj_id in index["ids"]
+                             if State.__matches(self.__state_dict[obj_id][prop_name], prop_value)]
+        return [self.__state_dict[obj_id] for obj_id in found_ids]
+
+    def __find_in_index(self, index, prop_name, prop_value):
+        # Returns the IDs of the objects whose value of the property is the given (hashable) value, or contains it as a
+        # substring or item. The latter are found in the substring and item lookups of the index, or by checking the
+        # objects whose value can not be indexed with the original matching rules.
+        found_per_lookup = [index["values"].get(prop_value, []), index["items"].get(prop_value, [])]
+        found_per_lookup.append([obj_id for value, obj_ids in index["strings"].items()
+                                 if value != prop_value and prop_value in value for obj_id in obj_ids])
+        found_per_lookup.append([obj_id for obj_id in index["other_ids"]
+                                 if State.__matches(self.__state_dict[obj_id][prop_name], prop_value)])
+        found_per_lookup = [found_ids for found_ids in found_per_lookup if len(found_ids) > 0]
+
+        if len(found_per_lookup) == 0:
+            return []
+        # Only the objects with exactly the requested value are listed in the order of the state, all others (e.g. the
+        # substring matches, which are listed per string value) are sorted
+        if len(found_per_lookup) == 1 and found_per_lookup[0] is index["values"].get(prop_value):
+            return found_per_lookup[0]
+
+        # Combine the objects found in different ways without duplicates, in the order of the state
+        positions = self.__get_positions()
+        return sorted({obj_id for found_ids in found_per_lookup for obj_id in found_ids}, key=positions.__getitem__)
+
+    def __get_property_index(self, prop_name):
+        # Returns the inverted index of a property, built on its first query after the state changed and reused for all
+        # later queries until it changes again. It contains the IDs of all objects with that property ("ids") and, for
+        # each hashable value, the IDs of the objects with that value ("values"). As an object is also found when the
+        # requested value is a substring or item of its value, the string values are listed separately ("strings"), and
+        # the IDs of objects with a list or tuple value are also listed per item ("items"). Objects with other
+        # unhashable or iterable values are checked one by one ("other_ids"). Earlier results are kept per requested
+        # value ("found").
+        index = self.__property_index.get(prop_name)
+        if index is not None:
+            return index
+
+        ids, values, strings, items, other_ids = [], {}, {}, {}, []
+        for obj_id, obj in self.__state_dict.items():
+            if prop_name not in obj:
+                continue
+            ids.append(obj_id)
+            value = obj[prop_name]
+            value_type = type(value)
+            if value_type is str:
+                obj_ids = values.get(value)
+                if obj_ids is None:
+                    obj_ids = values[value] = strings[value] = []
+                obj_ids.append(obj_id)
+                continue
+            try:
+                if value_type is list or value_type is tuple:
+                    for item in value:
+                        items.setdefault(item, []).append(obj_id)
+                    if value_type is tuple:
+                        values.setdefault(value, []).append(obj_id)
+                else:
+                    values.setdefault(value, []).append(obj_id)
+                    if isinstance(value, Iterable):
+                        other_ids.append(obj_id)
+            except TypeError:  # the value (or one of its items) is not hashable
+                other_ids.append(obj_id)
+
+        index = {"ids": ids, "values": values, "strings": strings, "items": items, "other_ids": other_ids, "found": {}}
+        self.__property_index[prop_name] = index
+        return index
+
+    def __get_positions(self):
+        # Returns the position of each object in the state, object IDs as keys
+        if self.__positions is None:
+            self.__positions = {obj_id: pos for pos, obj_id in enumerate(self.__state_dict.keys())}
+        return self.__positions
 
-        # Find all objects with that property and value if
-        # given. This uses Python's map function to bring our search to C.
-        located = map(locate, self.__state_dict.items())
-        return [l for l in located if l is not None]  # only return the found objects
+    @staticmethod
+    def __matches(value, prop_value):
+        # An object is found when the requested value is the value of its property OR is in that value (e.g. as
+        # substring or list item).
+        return prop_value == value or (isinstance(value, Iterable) and prop_value in value)
 
     @staticmethod
     def __is_iterable(arg):
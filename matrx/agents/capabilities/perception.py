@@ -0,0 +1,106 @@
+import numpy as np
+
+
+class PerceptionEngine:
+    """ Computes what agents perceive according to their `SenseCapability`, for many agents at once.
+
+    The engine uses the numpy arrays with the location and class of every object and agent in the `ObjectStore` of a
+    GridWorld. For a group of agents it computes a single agent by object distance matrix, from which the objects each
+    agent perceives are derived for all its sense capabilities (including the "*" wildcard) at once.
+
+    The perceived objects are the same and in the same order as when querying `GridWorld.get_objects_in_range` for each
+    object type of the capability, followed by all objects within the range of the "*" wildcard whose type has no range
+    of its own.
+    """
+
+    # The maximum number of elements in a single agent by object matrix, limiting the memory used for large worlds
+    MAX_MATRIX_SIZE = 2 ** 22
+
+    def __init__(self, object_store):
+        """ Create the engine for the given store of a GridWorld.
+
+        Parameters
+        ----------
+        object_store : ObjectStore
+            The columnar store with the locations and classes of the objects and agents of the GridWorld.
+        """
+        self.__store = object_store
+
+    @property
+    def version(self):
+        """ Changes whenever objects move, are added or removed. Can be used to check whether previously computed
+        perceptions are still valid.
+        """
+        return self.__store.version
+
+    def perceive(self, agent_bodies):
+        """ Computes which objects each of the given agents perceives.
+
+        Parameters
+        ----------
+        agent_bodies : list
+            The `AgentBody` instances of the agents for which to compute their perception.
+
+        Returns
+        -------
+        dict
+            The agent IDs as keys, and as values a list of (obj_id, obj) pairs of the objects and agents that agent
+            perceives.
+        """
+        # Agents with the same sense capabilities are handled together
+        groups = {}
+        for agent_body in agent_bodies:
+            capabilities = agent_body.sense_capability.get_capabilities()
+            groups.setdefault(tuple(capabilities.items()), []).append(agent_body)
+
+        perceived = {}
+        chunk_size = max(1, self.MAX_MATRIX_SIZE // max(1, len(self.__store.objects)))
+        for capabilities, agents in groups.items():
+            queries = self.__get_queries(dict(capabilities))
+            for start in range(0, len(agents), chunk_size):
+                chunk = agents[start:start + chunk_size]
+                perceived.update(self.__perceive_chunk(chunk, queries))
+
+        return perceived
+
+    def __perceive_chunk(self, agent_bodies, queries):
+        """ Computes the perception of the given agents that share the given queries. """
+        store = self.__store
+        agent_locs = np.array([agent_body.location for agent_body in agent_bodies], dtype=float).reshape(-1, 2)
+        diff_x = agent_locs[:, 0:1] - store.x
+        diff_y = agent_locs[:, 1:2] - store.y
+        distances = np.sqrt(diff_x * diff_x + diff_y * diff_y)
+
+        # The rank of each object is the first query that finds it, which determines the order in which objects are
+        # perceived. Objects found by no query get the rank len(queries).
+        nr_queries = len(queries)
+        ranks = np.full(distances.shape, nr_queries, dtype=int)
+        for rank in reversed(range(nr_queries)):
+            class_mask, sense_range = queries[rank]
+            ranks[(distances <= sense_range) & class_mask[store.class_ids]] = rank
+
+        objects = store.objects
+        perceived = {}
+        for agent_body, agent_ranks in zip(agent_bodies, ranks):
+            rows = np.flatnonzero(agent_ranks < nr_queries)
+            rows = rows[np.argsort(agent_ranks[rows], kind="stable")]
+            perceived[agent_body.obj_id] = [objects[row] for row in rows]
+
+        return perceived
+
+    def __get_queries(self, capabilities):
+        """ Translates sense capabilities to a list of (class mask, range) queries, in the order in which their objects
+        are perceived. A class mask tells for each class of the store whether the query can find its objects.
+        """
+        wildcard_range = capabilities.pop("*", None)
+
+        queries = []
+        for obj_type, sense_range in capabilities.items():
+            queries.append((self.__store.get_class_mask(obj_type), sense_range))
+
+        # The wildcard finds all objects, except those whose exact type has its own range
+        if wildcard_range is not None:
+            class_mask = np.array([cls not in capabilities for cls in self.__store.classes], dtype=bool)
+            queries.append((class_mask, wildcard_range))
+
+        return queries
@@ -68,6 +68,24 @@ def get_info():
     _MATRX_info['matrx_version'] = _matrx_version
     return jsonify(_MATRX_info)
 
+@__app.route('/get_tick_profile/', methods=['GET', 'POST'])
+@__app.route('/get_tick_profile', methods=['GET', 'POST'])
+def get_tick_profile():
+    """ Provides the rolling statistics on the duration of each phase of the most recent ticks, in total and per
+    agent. Requires the world to be created with profiling enabled.
+
+    API Path: ``http://>MATRX_core_ip<:3001/get_tick_profile``
+
+    Returns
+        The statistics per phase and agent, see `TickProfiler.get_statistics`. 400 error if the world is not profiled.
+    -------
+    """
+    if _gw is None or _gw.profiler is None:
+        return __return_error(code=400, message="The tick profile is only available when the world is created with "
+                                                "profiling enabled.")
+    return jsonify(_gw.profiler.get_statistics())
+
+
 @__app.route('/get_latest_state_and_messages/', methods=['GET', 'POST'])
 @__app.route('/get_latest_state_and_messages', methods=['GET', 'POST'])
 def get_latest_state_and_messages():
@@ -974,6 +992,8 @@ def __reorder_state(state):
         The world state, JSON serializable
     """
     new_state = copy.copy(state.as_dict())
+    if "World" in new_state:
+        new_state["World"] = __get_serializable_world_info(new_state["World"])
 
     # loop through all objects in the state
     for objID, obj in state.items():
@@ -981,11 +1001,19 @@ def __reorder_state(state):
         if objID != "World":
             # make the sense capability JSON serializable
             if "sense_capability" in obj:
-                new_state[objID]["sense_capability"] = str(obj["sense_capability"])
+                # copy the properties, as they are shared with the object they belong to
+                new_state[objID] = {**obj, "sense_capability": str(obj["sense_capability"])}
 
     return new_state
 
 
+def __get_serializable_world_info(world_info):
+    """ Returns the world info without the rooms, which the visualization does not use. """
+    if "rooms" not in world_info:
+        return world_info
+    return {key: value for key, value in world_info.items() if key != "rooms"}
+
+
 def _add_state(agent_id, state, agent_inheritence_chain, world_settings):
     """ Saves the state of an agent for use via the api
 
@@ -1005,7 +1033,7 @@ def _add_state(agent_id, state, agent_inheritence_chain, world_settings):
     # save the new general info on the MATRX World (once)
     global _next_tick_info
     if _next_tick_info == {}:
-        _next_tick_info = world_settings
+        _next_tick_info = __get_serializable_world_info(world_settings)
 
     # Make sure the world settings are in the state, as these are used by the visualization
     if 'World' not in state:
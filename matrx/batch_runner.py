@@ -0,0 +1,180 @@
+import copy
+import csv
+import multiprocessing
+import time
+import traceback
+
+import numpy as np
+
+
+class BatchRunner:
+    """ Runs multiple worlds of a :class:`matrx.world_builder.WorldBuilder` in parallel, each in a worker process.
+
+    Each world has its own random seed, derived from the `random_seed` of the builder, which seeds both the random
+    number generator of the builder (e.g. for its random properties and prospects) and the world itself. Each world is
+    created from a copy of the builder as it was given, so also its agent brains are copies that start afresh in every
+    world. A world therefore does not depend on the other worlds nor on the process it runs in, and the results are
+    identical to those of running the worlds one after the other, e.g. with `get_world`. Each world is run headless,
+    without the API, and its goal status, number of ticks, logger files and timing are collected in one result table
+    (see `run`).
+
+    Examples
+    --------
+    Run 100 worlds on all cores, and save the results:
+
+    >>> from matrx import WorldBuilder
+    >>> from matrx.batch_runner import BatchRunner
+    >>> builder = WorldBuilder(shape=(10, 10), random_seed=42, simulation_goal=1000)
+    >>> runner = BatchRunner(builder, nr_of_worlds=100)
+    >>> results = runner.run()
+    >>> runner.write_results("results.csv")
+    """
+
+    # The columns of the result table, in order
+    COLUMNS = ("world_nr", "world_id", "random_seed", "is_done", "goal_status", "nr_ticks", "duration",
+               "ticks_per_second", "logger_files", "error")
+
+    def __init__(self, builder, nr_of_worlds, nr_processes=None, start_method=None):
+        """ Create a batch runner.
+
+        Parameters
+        ----------
+        builder : WorldBuilder
+            The builder whose worlds are run. Its API and visualizer are not used. It is copied for each world, so it
+            (including its agent brains) should be copyable.
+        nr_of_worlds : int
+            The number of worlds to run.
+        nr_processes : int (optional, default None)
+            The number of worker processes. When None, the number of CPUs is used.
+        start_method : str (optional, default None)
+            The `multiprocessing` start method of the worker processes, e.g. "fork" or "spawn". When None, the default
+            of the platform is used. With "spawn", the builder is pickled and all classes it uses should be importable
+            from a module.
+
+        Raises
+        ------
+        ValueError
+            When `nr_of_worlds` is not an integer larger or equal to 1.
+        """
+        if not isinstance(nr_of_worlds, int) or nr_of_worlds <= 0:
+            raise ValueError(f"The given nr_of_worlds {nr_of_worlds} should "
+                             f"be of type Int and larger or equal to 1.")
+
+        self.__builder = builder
+        self.__nr_of_worlds = nr_of_worlds
+        self.__nr_processes = nr_processes
+        self.__start_method = start_method
+        self.__results = None
+
+        # Derive the random seed of each world from the random seed of the builder
+        seed_sequences = np.random.SeedSequence(builder.world_settings["rnd_seed"]).spawn(nr_of_worlds)
+        self.__seeds = [int(seed_sequence.generate_state(1)[0]) for seed_sequence in seed_sequences]
+
+    @property
+    def seeds(self):
+        """ The random seed of each world, in the order of the world numbers. """
+        return list(self.__seeds)
+
+    @property
+    def results(self):
+        """ The result table of the last run, see `run`. None if it did not run yet. """
+        return self.__results
+
+    def run(self):
+        """ Runs all worlds and returns their results.
+
+        Returns
+        -------
+        list
+            The result table, with a dictionary per world in the order in which the worlds would be created serially.
+            Each has the number of the world ("world_nr", starting at 1) and its ID ("world_id"), whether its goals were
+            reached ("is_done") with the `is_done` of each of its goals ("goal_status"), the number of ticks it ran
+            ("nr_ticks"), how long its run took in seconds ("duration") and the achieved ticks per second
+            ("ticks_per_second"), and the files of its loggers ("logger_files"). When a world raised an exception, its
+            traceback is given ("error", None otherwise) and the other results are None. The random seed of each world
+            is given as well ("random_seed").
+        """
+        tasks = [(world_nr, seed) for world_nr, seed in enumerate(self.__seeds, start=1)]
+        context = multiprocessing.get_context(self.__start_method)
+        with context.Pool(self.__nr_processes, initializer=_init_worker, initargs=(self.__builder,)) as pool:
+            self.__results = pool.map(_run_world, tasks, chunksize=1)
+
+        return self.__results
+
+    def get_world(self, world_nr):
+        """ Creates the world with the given number in the main process, as it is created when the runner runs (apart
+        from running it headless). Can be used to run or inspect a single world of the batch.
+
+        Parameters
+        ----------
+        world_nr : int
+            The number of the world, starting at 1.
+
+        Returns
+        -------
+        GridWorld
+            The world, which is not run yet.
+        """
+        return _create_world(self.__builder, world_nr, self.__seeds[world_nr - 1])
+
+    def write_results(self, file_path, delimiter=";"):
+        """ Writes the result table of the last run (see `run`) as a CSV file, with a row per world.
+
+        Raises
+        ------
+        ValueError
+            When the runner did not run yet.
+        """
+        if self.__results is None:
+            raise ValueError("There are no results to write, the BatchRunner did not run yet.")
+
+        with open(file_path, mode="w", newline="") as data_file:
+            writer = csv.DictWriter(data_file, fieldnames=self.COLUMNS, delimiter=delimiter)
+            writer.writeheader()
+            writer.writerows(self.__results)
+
+
+# The builder of the worker process, set when the process starts
+_builder = None
+
+
+def _init_worker(builder):
+    """ Sets the builder of the worker process, which only runs headless worlds. """
+    global _builder
+    _builder = builder
+    _builder.world_settings["headless"] = True
+
+
+def _create_world(builder, world_nr, seed):
+    """ Creates the world with the given number and random seed from a copy of the given builder, so neither the
+    builder nor its agent brains are changed by it. """
+    builder = copy.deepcopy(builder)
+    builder.worlds_created = world_nr - 1
+    builder.rng = np.random.RandomState(seed)
+    builder.world_settings["rnd_seed"] = seed
+    return builder.get_world()
+
+
+def _run_world(task):
+    """ Creates and runs the world with the given number and random seed, and returns its results. """
+    world_nr, seed = task
+    result = dict.fromkeys(BatchRunner.COLUMNS)
+    result["world_nr"] = world_nr
+    result["random_seed"] = seed
+    try:
+        world = _create_world(_builder, world_nr, seed)
+        result["world_id"] = world.world_id
+
+        start_time = time.perf_counter()
+        world.run({"run_matrx_api": False, "api_thread": False})
+        result["duration"] = time.perf_counter() - start_time
+
+        goals = world.simulation_goal if isinstance(world.simulation_goal, list) else [world.simulation_goal]
+        result["is_done"] = bool(world.is_done)
+        result["goal_status"] = [bool(goal.is_done) for goal in goals]
+        result["nr_ticks"] = world.current_nr_ticks
+        result["ticks_per_second"] = world.ticks_per_second
+        result["logger_files"] = [logger.file_name for logger in world.loggers]
+    except Exception:
+        result["error"] = traceback.format_exc()
+    return result
@@ -74,6 +74,48 @@ class WorldGoal:
         return copy.deepcopy(self)
 
 
+class IncrementalGoal:
+    """
+    An interface for world goals that only need to be checked again when relevant objects change, instead of every
+    tick. A goal can implement it alongside `WorldGoal` or `WorldGoalV2`.
+
+    The GridWorld informs such goals whenever an object or agent is added, removed, moved or when one of its properties
+    changed. The goal keeps track of whether any of these events may affect whether it is reached, and tells so through
+    `needs_check`. The GridWorld only calls `goal_reached` when the goal needs a check; otherwise it uses `is_done`.
+
+    Note that only changes the GridWorld is aware of are passed on, such as those through `change_property` or by
+    setting the location of an object.
+    """
+
+    def needs_check(self):
+        """
+        Returns whether the goal needs to be checked this tick, as objects changed that may affect it since the last
+        check. By default, a goal is always checked.
+
+        Returns
+        -------
+        needs_check : bool
+            True when `goal_reached` should be called, False when `is_done` is still up to date.
+        """
+        return True
+
+    def object_added(self, obj):
+        """ Called by the GridWorld when the given object or agent is added to the world. """
+        pass
+
+    def object_removed(self, obj):
+        """ Called by the GridWorld when the given object or agent is removed from the world. """
+        pass
+
+    def object_moved(self, obj, prev_location):
+        """ Called by the GridWorld when the given object or agent moved from the given previous location. """
+        pass
+
+    def object_changed(self, obj):
+        """ Called by the GridWorld when one or more properties of the given object or agent changed. """
+        pass
+
+
 class LimitedTimeGoal(WorldGoal):
     """
     A world goal that simply tracks whether a maximum number of ticks has been reached.
@@ -161,7 +203,7 @@ class LimitedTimeGoal(WorldGoal):
         return min(1.0, grid_world.current_nr_ticks / self.max_nr_ticks)
 
 
-class CollectionGoal(WorldGoal):
+class CollectionGoal(WorldGoal, IncrementalGoal):
 
     def __init__(self, name, target_name, in_order=False):
         super().__init__()
@@ -172,6 +214,8 @@ class CollectionGoal(WorldGoal):
 
         # Set attributes we will use to speed up things and keep track of collected objects
         self.__drop_off_locs = None  # all locations where objects can be dropped off
+        self.__drop_off_cells = set()  # the same locations as tuples, to quickly check whether an object is at one
+        self.__needs_check = True  # whether objects changed at the drop off locations since the last check
         self.__target = None  # all (ordered) objects that need to be collected described in their properties
         self.__dropped_objects = {}  # a dictionary of the required dropped objects (id as key, tick as value)
         self.__attained_rank = 0  # The maximum attained rank of the correctly collected objects (only used if in_order)
@@ -193,6 +237,7 @@ class CollectionGoal(WorldGoal):
         # Go all drop locations and check if the requested objects are there (potentially dropped in the right order)
         is_satisfied = self.__check_completion(grid_world)
         self.is_done = is_satisfied
+        self.__needs_check = False
 
         return is_satisfied
 
@@ -203,6 +248,7 @@ class CollectionGoal(WorldGoal):
                     and self.__area_name == obj.properties['name']:
                 loc = obj.location
                 self.__drop_off_locs.append(loc)
+                self.__drop_off_cells.add(tuple(loc))
 
     def __find_collection_objects(self, grid_world):
         all_objs = grid_world.environment_objects
@@ -235,22 +281,21 @@ class CollectionGoal(WorldGoal):
         # Get all world objects and agents
         all_objs = grid_world.environment_objects
         all_agents = grid_world.registered_agents
-        all_ = {**all_objs, **all_agents}
 
         # Go through all objects at the drop off locations. If an object was not already detected before as a
         # required object, check if it is one of the desired objects. Also, ignore all drop off tiles and targets.
         detected_objs = {}
         for obj_id in obj_ids:
-            obj_props = all_[obj_id].properties
+            obj = all_objs[obj_id] if obj_id in all_objs else all_agents[obj_id]
+            obj_props = obj.properties
             # Check if the object is either a collection area tile or a collection target object, if so skip it
             if ("is_drop_off" in obj_props.keys() and "collection_area_name" in obj_props.keys()) \
                     or ("is_drop_off_target" in obj_props.keys() and "collection_zone_name" in obj_props.keys()
                         and "is_invisible" in obj_props.keys()):
                 continue
-            for req_props in self.__target:
-                obj_props = utils._flatten_dict(obj_props)
-                if req_props.items() <= obj_props.items():
-                    detected_objs[obj_id] = curr_tick
+            obj_props = utils._flatten_dict(obj_props)
+            if any(req_props.items() <= obj_props.items() for req_props in self.__target):
+                detected_objs[obj_id] = curr_tick
 
         # Now compare the detected objects with the previous detected objects to see if any new objects were detected
         # and thus should be added to the dropped objects
@@ -276,7 +321,8 @@ class CollectionGoal(WorldGoal):
             sorted_dropped_obj = sorted(self.__dropped_objects.items(), key=lambda x: x[1], reverse=False)
             rank = 0
             for obj_id, tick in sorted_dropped_obj:
-                props = all_[obj_id].properties
+                obj = all_objs[obj_id] if obj_id in all_objs else all_agents[obj_id]
+                props = obj.properties
                 props = utils._flatten_dict(props)
                 req_props = self.__target[rank]
                 if req_props.items() <= props.items():
@@ -320,6 +366,28 @@ class CollectionGoal(WorldGoal):
 
         return progress
 
+    def needs_check(self):
+        # Until the drop off locations are known, the goal is checked to find them
+        return self.__needs_check or self.__drop_off_locs is None
+
+    def object_added(self, obj):
+        self.__object_event(obj.location)
+
+    def object_removed(self, obj):
+        self.__object_event(obj.location)
+
+    def object_moved(self, obj, prev_location):
+        self.__object_event(prev_location)
+        self.__object_event(obj.location)
+
+    def object_changed(self, obj):
+        self.__object_event(obj.location)
+
+    def __object_event(self, location):
+        # Only objects at (or moving from or to) a drop off location can change whether this goal is reached
+        if not self.__needs_check and tuple(location) in self.__drop_off_cells:
+            self.__needs_check = True
+
     @classmethod
     def get_random_order_property(cls, possibilities, length=None, with_duplicates=False):
         """ Creates a `RandomProperty` representing a list of potential objects to collect in a certain order.
@@ -531,7 +599,7 @@ class LimitedTimeGoalV2(WorldGoalV2):
         return min(1.0, grid_world.current_nr_ticks / self.max_nr_ticks)
 
 
-class CollectionGoalV2(WorldGoalV2):
+class CollectionGoalV2(WorldGoalV2, IncrementalGoal):
 
     def __init__(self, name, target_name, in_order=False):
         super().__init__()
@@ -542,6 +610,8 @@ class CollectionGoalV2(WorldGoalV2):
 
         # Set attributes we will use to speed up things and keep track of collected objects
         self.__drop_off_locs = None  # all locations where objects can be dropped off
+        self.__drop_off_cells = set()  # the same locations as tuples, to quickly check whether an object is at one
+        self.__needs_check = True  # whether objects changed at the drop off locations since the last check
         self.__target = None  # all (ordered) objects that need to be collected described in their properties
         self.__dropped_objects = {}  # a dictionary of the required dropped objects (id as key, tick as value)
         self.__attained_rank = 0  # The maximum attained rank of the correctly collected objects (only used if in_order)
@@ -563,6 +633,7 @@ class CollectionGoalV2(WorldGoalV2):
         # Go all drop locations and check if the requested objects are there (potentially dropped in the right order)
         is_satisfied = self.__check_completion(grid_world)
         self.is_done = is_satisfied
+        self.__needs_check = False
 
         return is_satisfied
 
@@ -573,6 +644,7 @@ class CollectionGoalV2(WorldGoalV2):
                     and self.__area_name == obj.properties['name']:
                 loc = obj.location
                 self.__drop_off_locs.append(loc)
+                self.__drop_off_cells.add(tuple(loc))
 
     def __find_collection_objects(self, grid_world):
         all_objs = grid_world.environment_objects
@@ -605,22 +677,21 @@ class CollectionGoalV2(WorldGoalV2):
         # Get all world objects and agents
         all_objs = grid_world.environment_objects
         all_agents = grid_world.registered_agents
-        all_ = {**all_objs, **all_agents}
 
         # Go through all objects at the drop off locations. If an object was not already detected before as a
         # required object, check if it is one of the desired objects. Also, ignore all drop off tiles and targets.
         detected_objs = {}
         for obj_id in obj_ids:
-            obj_props = all_[obj_id].properties
+            obj = all_objs[obj_id] if obj_id in all_objs else all_agents[obj_id]
+            obj_props = obj.properties
             # Check if the object is either a collection area tile or a collection target object, if so skip it
             if ("is_drop_off" in obj_props.keys() and "collection_area_name" in obj_props.keys()) \
                     or ("is_drop_off_target" in obj_props.keys() and "collection_zone_name" in obj_props.keys()
                         and "is_invisible" in obj_props.keys()):
                 continue
-            for req_props in self.__target:
-                obj_props = utils._flatten_dict(obj_props)
-                if req_props.items() <= obj_props.items():
-                    detected_objs[obj_id] = curr_tick
+            obj_props = utils._flatten_dict(obj_props)
+            if any(req_props.items() <= obj_props.items() for req_props in self.__target):
+                detected_objs[obj_id] = curr_tick
 
         # Now compare the detected objects with the previous detected objects to see if any new objects were detected
         # and thus should be added to the dropped objects
@@ -646,7 +717,8 @@ class CollectionGoalV2(WorldGoalV2):
             sorted_dropped_obj = sorted(self.__dropped_objects.items(), key=lambda x: x[1], reverse=False)
             rank = 0
             for obj_id, tick in sorted_dropped_obj:
-                props = all_[obj_id].properties
+                obj = all_objs[obj_id] if obj_id in all_objs else all_agents[obj_id]
+                props = obj.properties
                 props = utils._flatten_dict(props)
                 req_props = self.__target[rank]
                 if req_props.items() <= props.items():
@@ -690,6 +762,28 @@ class CollectionGoalV2(WorldGoalV2):
 
         return progress
 
+    def needs_check(self):
+        # Until the drop off locations are known, the goal is checked to find them
+        return self.__needs_check or self.__drop_off_locs is None
+
+    def object_added(self, obj):
+        self.__object_event(obj.location)
+
+    def object_removed(self, obj):
+        self.__object_event(obj.location)
+
+    def object_moved(self, obj, prev_location):
+        self.__object_event(prev_location)
+        self.__object_event(obj.location)
+
+    def object_changed(self, obj):
+        self.__object_event(obj.location)
+
+    def __object_event(self, location):
+        # Only objects at (or moving from or to) a drop off location can change whether this goal is reached
+        if not self.__needs_check and tuple(location) in self.__drop_off_cells:
+            self.__needs_check = True
+
     @classmethod
     def get_random_order_property(cls, possibilities, length=None, with_duplicates=False):
         """ Creates a `RandomProperty` representing a list of potential objects to collect in a certain order.
@@ -1,21 +1,51 @@
-import datetime
+import math
 import os.path
 import warnings
 from collections import OrderedDict
 import time
 import copy
+import copyreg
+import io
+import pickle
+import types
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from contextlib import nullcontext
 
 import gevent
 
 from matrx.actions.object_actions import *
-from matrx.goals import WorldGoalV2
+from matrx.goals import WorldGoalV2, IncrementalGoal
 from matrx.logger.logger import GridWorldLogger, GridWorldLoggerV2
 from matrx.agents.agent_utils.state import State
+from matrx.agents.capabilities.perception import PerceptionEngine
 from matrx.objects.env_object import EnvObject
+from matrx.objects.object_store import ObjectStore
 from matrx.objects.standard_objects import AreaTile
 from matrx.messages.message_manager import MessageManager
+from matrx.action_recorder import ActionRecorder
+from matrx.room_registry import RoomRegistry
 from matrx.objects.agent_body import _get_all_classes
 from matrx.api import api
+from matrx.tick_profiler import TickProfiler
+from matrx.tick_scheduler import TickScheduler
+
+# The context manager used to measure phases of a tick when not profiling, which does nothing
+_NO_MEASUREMENT = nullcontext()
+
+
+def _reduce_method(method):
+    """ Pickles a bound method by the object and the name of its function. Unlike the default, this also supports
+    private methods (e.g. the callbacks the GridWorld sets in its objects), whose names are mangled. """
+    name = method.__func__.__name__
+    if name.startswith("__") and not name.endswith("__"):
+        class_name = method.__func__.__qualname__.rsplit(".", 2)[-2].lstrip("_")
+        name = f"_{class_name}{name}"
+    return getattr, (method.__self__, name)
+
+
+# The reduction functions used to pickle snapshots of a GridWorld
+_SNAPSHOT_DISPATCH_TABLE = copyreg.dispatch_table.copy()
+_SNAPSHOT_DISPATCH_TABLE[types.MethodType] = _reduce_method
 
 
 class GridWorld:
@@ -23,7 +53,9 @@ class GridWorld:
     """
 
     def __init__(self, shape, tick_duration, simulation_goal, rnd_seed=1,
-                 visualization_bg_clr="#C2C2C2", visualization_bg_img=None, verbose=False, world_id=0):
+                 visualization_bg_clr="#C2C2C2", visualization_bg_img=None, verbose=False, world_id=0,
+                 headless=False, decision_threads=None, profile=False, decision_budget=None,
+                 overrun_policy="idle", max_catch_up_ticks=0, record_actions=False):
 
         """ Create a GridWorld instance.
 
@@ -65,6 +97,46 @@ class GridWorld:
            The ID of this world. Every new GridWorld instance should have a unique ID, such that the frontend knows
            when it has to reinitialize the visualization.
 
+        headless : bool (optional, False)
+           Whether to run as fast as possible without the API. In this mode the `tick_duration` is ignored and no
+           states are collected for the API. At the end of `run` the achieved number of ticks per second is printed.
+
+        decision_threads : int (optional, None)
+           The number of threads on which agents decide on their actions in parallel. When None, agents decide one
+           after the other. In parallel, an agent starts deciding once the decisions of the agents before it that it
+           perceives are processed, so it perceives their changes (e.g. their current action and whether they are
+           busy) as when agents decide one after the other. Agents that perceive each other therefore still decide one
+           after the other. All decisions are processed in the order of registration.
+           The result is the same as when agents decide one after the other, except when an agent depends on a
+           change of an agent it does not perceive that decides before it in the same tick. For instance, when that
+           agent moves into its perception by changing its location property, or when it checks whether an action is
+           possible while that agent changes.
+
+        profile : bool (optional, False)
+           Whether to measure the duration of each phase of every tick, see `TickProfiler`. The statistics can be
+           obtained through the `profiler` property, or through the API.
+
+        decision_budget : float (optional, None)
+           The maximum number of seconds an agent may take to decide on an action. When None, the world waits for every
+           decision. Otherwise agents decide on separate threads, and an agent that exceeds its budget is handled
+           according to the `overrun_policy` while its decision continues in the background. The number of times each
+           agent exceeded its budget is available through `decision_overruns`.
+
+        overrun_policy : str (optional, "idle")
+           What an agent does when its decision exceeds the `decision_budget`, and on the following ticks until that
+           decision is done: "idle" to idle, "reuse_last_action" to perform its last action again, or
+           "apply_next_tick" to idle and use the late decision on the first tick after it is done. With the first two
+           policies, the late decision is discarded and the agent decides anew. While an agent is still deciding, its
+           messages are collected on the tick its decision is processed.
+
+        max_catch_up_ticks : float (optional, 0)
+           Ticks are paced towards absolute deadlines, see `TickScheduler`. After ticks that took longer than the
+           `tick_duration`, the following ticks catch up by sleeping less as long as the world is at most this number
+           of tick durations behind. Otherwise the missed ticks are dropped. When 0, the world never catches up.
+
+        record_actions : bool (optional, False)
+           Whether to record the actions, messages and user input of all agents in every tick, such that the run can
+           be replayed without the agent brains. See `action_recorder` and `replay`.
 
         Examples
         --------
@@ -80,16 +152,36 @@ class GridWorld:
         """
 
         self.__tick_duration = tick_duration  # How long each tick should take (process sleeps until this time passed)
+        self.__tick_scheduler = TickScheduler(tick_duration, max_catch_up_ticks)  # paces the ticks
         self.__shape = shape  # The width and height of the GridWorld
         self.__visualization_bg_clr = visualization_bg_clr  # The background color of the visualisation
         self.__visualization_bg_img = visualization_bg_img  # The background image of the visualisation
         self.__verbose = verbose  # Set whether we should print anything or not
         self.world_id = world_id  # ID of this simulation world
+        self.__headless = headless  # Whether to run as fast as possible, without tick pacing and the API
+        self.__ticks_per_second = None  # The number of ticks per second achieved during the last run
+        self.__decision_threads = decision_threads  # The number of threads on which agents decide, None if serial
+        self.__decision_pool = None  # The thread pool on which agents decide, created when first needed
+        self.__profiler = TickProfiler() if profile else None  # Measures the duration of each phase of a tick
+        self.__decision_budget = decision_budget  # The maximum number of seconds an agent may take to decide
+        self.__overrun_policy = overrun_policy  # What an agent does when it exceeds its decision budget
+        self.__decision_deadlines = {}  # agent IDs (keys) and the deadline and state of their current decision (values)
+        self.__overrun_decisions = {}  # agent IDs (keys) and the Future and given properties of their late decision
+        self.__decision_overruns = {}  # agent IDs (keys) and the number of times they exceeded the budget (values)
+        self.__action_recorder = ActionRecorder() if record_actions else None  # records what the agents decide
+        self.__replay = None  # the ActionRecorder of the run that is replayed instead of letting the agents decide
 
         self.__teams = {}  # dictionary with team names (keys), and agents in those teams (values)
+        self.__rooms = RoomRegistry()  # the rooms added with the WorldBuilder, shared with all states
         self.__registered_agents = OrderedDict()  # The dictionary of all existing agents in the GridWorld
         self.__environment_objects = OrderedDict()  # The dictionary of all existing objects in the GridWorld
+        self.__updated_objects = OrderedDict()  # The objects that override EnvObject.update, see __update_objects
         self.__obj_indices = {} # keeps track of all obj_ids added, indexed by their (preprocessed) obj ID
+        self.__registration_order = {}  # obj_id (keys) and a counter of when it was (last) registered (values)
+        self.__nr_registrations = 0  # the number of registrations done, used as the counter for the above
+        self.__type_index = {}  # class (keys) and the set of IDs of all objects and agents of that class (values)
+        self.__object_store = ObjectStore(self.__environment_objects, self.__registered_agents)  # columnar attributes
+        self.__perception = PerceptionEngine(self.__object_store)  # agent perception
 
         # Load about file and fetch MATRX version
         about = {}
@@ -108,10 +200,22 @@ class GridWorld:
         else:
             self.__simulation_goal = simulation_goal.reset()
 
+        # The goals that are informed of changes to objects, so they are only checked when relevant objects changed
+        goals = self.__simulation_goal if isinstance(self.__simulation_goal, list) else [self.__simulation_goal]
+        self.__incremental_goals = [goal for goal in goals if isinstance(goal, IncrementalGoal)]
+
         # Get all actions within all currently imported files
         self.__all_actions = _get_all_classes(Action, omit_super_class=True)
 
-        # Initialise an empty grid, a simple 2D array with ID's
+        # The action registry, filled in `initialize`. Actions are stateless, so a single instance of each action is
+        # reused to check and perform it for all agents and ticks.
+        self.__action_handlers = {}  # action name (keys) and the reusable instance of that action (values)
+        self.__action_durations = {}  # action name (keys) and the default duration in ticks of that action (values)
+        self.__agent_action_sets = {}  # agent ID (keys) and its action set as given and as a set (values)
+        self.__agent_brains = {}  # agent ID (keys) and its brain (values)
+
+        # Initialise an empty grid, a simple 2D array with ID's. This is our occupancy index; it is updated
+        # incrementally whenever an object is registered, removed or changes its location.
         self.__grid = np.array([[None for _ in range(shape[0])] for _ in range(shape[1])])
 
         self.__api_info = None  # Dict containing info about the API instance
@@ -159,15 +263,22 @@ class GridWorld:
 
         # Only initialize when we did not already do so
         if not self.__is_initialized:
-            # We update the grid, which fills everything with added objects and agents
-            self.__update_grid()
+            # Create the handler of every known action once
+            self.__build_action_registry()
+
+            # The agent brains are not used when replaying
+            if self.__replay is None:
+                for agent_body in self.__registered_agents.values():
+                    agent_body.brain_initialize_func()
 
-            for agent_body in self.__registered_agents.values():
-                agent_body.brain_initialize_func()
+            if self.__action_recorder is not None:
+                self.__action_recorder.agent_ids = list(self.__registered_agents.keys())
 
             # set the api variables
             self.__api_info = api_info
             self.__run_matrx_api = self.__api_info['run_matrx_api']
+            if self.__headless and self.__run_matrx_api:
+                raise ValueError("A headless GridWorld cannot run with the MATRX API, set `run_matrx_api` to False.")
             if self.__run_matrx_api:
                 # initialize this world in the api
                 api._reset_api()
@@ -236,12 +347,16 @@ class GridWorld:
 
         if self.__verbose:
             print(f"@{os.path.basename(__file__)}: Starting game loop...")
+        start_time = time.perf_counter()
+        start_nr_ticks = self.__current_nr_ticks
         is_done = False
         while not is_done:
 
             if self.__run_matrx_api and api.matrx_paused:
                 print("MATRX paused through api")
                 gevent.sleep(1)
+                # The ticks continue from their own schedule after the pause
+                self.__tick_scheduler.reset()
             else:
                 is_done, tick_duration = self.__step()
 
@@ -249,6 +364,145 @@ class GridWorld:
                 print("Scenario stopped through api")
                 break
 
+        # Stop the threads on which agents decided (if any), without waiting for decisions that exceeded the budget
+        if self.__decision_pool is not None:
+            self.__decision_pool.shutdown(wait=len(self.__overrun_decisions) == 0)
+            self.__decision_pool = None
+
+        # Compute the throughput of this run
+        run_duration = time.perf_counter() - start_time
+        nr_ticks = self.__current_nr_ticks - start_nr_ticks
+        self.__ticks_per_second = nr_ticks / run_duration if run_duration > 0 else float("inf")
+        if self.__headless:
+            print(f"@{os.path.basename(__file__)}: Ran {nr_ticks} ticks in {run_duration:.3f} seconds "
+                  f"({self.__ticks_per_second:.1f} ticks/second).")
+
+    def step(self):
+        """ Performs a single tick of this GridWorld, for example to run it up to a certain tick and take a snapshot
+        there. The GridWorld should be initialized first, see `initialize`. Use `run` to run it until its goals are
+        reached.
+
+        Returns
+        -------
+        is_done : bool
+            Whether the GridWorld is done, as its goals are reached.
+        tick_duration : float
+            The duration of the tick in seconds, including the time waited to pace the ticks (0 when headless).
+        """
+        return self.__step()
+
+    def replay(self, recorder):
+        """ Sets this GridWorld to replay a recorded run, see `ActionRecorder`, instead of letting its agents decide.
+
+        When replaying, the agent brains are bypassed: they are not initialized, do not perceive nor decide, and do not
+        receive messages or the results of their actions. Instead, each agent changes its properties and performs the
+        action it decided on in the recorded run, and sends the messages it sent then. Loggers receive the recorded log
+        data of the agents. As a result, this world goes through the same states as the recorded one, as long as it is
+        created in the same way (e.g. from the same builder with the same random seed). After the last recorded tick,
+        the agents idle.
+
+        Should be called before the GridWorld is initialized (see `initialize`) or run.
+
+        Parameters
+        ----------
+        recorder : ActionRecorder
+            The recording to replay, e.g. the `action_recorder` of a world with `record_actions=True`.
+
+        Raises
+        ------
+        ValueError
+            When the GridWorld is already initialized, or when its agents differ from those of the recording.
+        """
+        if self.__is_initialized:
+            raise ValueError(f"GridWorld {self.world_id} can only replay a recording before it is initialized.")
+        agent_ids = list(self.__registered_agents.keys())
+        if len(recorder.agent_ids) > 0 and recorder.agent_ids != agent_ids:
+            raise ValueError(f"The agents {agent_ids} of GridWorld {self.world_id} differ from the agents "
+                             f"{recorder.agent_ids} of the recording to replay.")
+        self.__replay = recorder
+
+    def snapshot(self):
+        """ Captures the complete state of this GridWorld in a compact binary form, from which it can be restored.
+
+        The snapshot contains all objects and agents with their brains, the grid, the number of ticks, the state of all
+        random number generators, the messages, the goals and loggers, and which agents are busy with which action.
+        Restoring it with `GridWorld.restore` creates a new GridWorld that continues from this point, which is much
+        faster than creating the world anew and running all ticks up to this point. As a snapshot can be restored any
+        number of times, it can also be used to branch multiple runs from the same point.
+
+        A snapshot can only be taken between ticks and when no agent is still deciding (see `decision_budget`). All
+        agent brains, objects, goals and loggers should be picklable, so brains hosted in another process (a
+        `RemoteAgentBrain`) are not supported. The MATRX API is not part of the snapshot.
+
+        Returns
+        -------
+        bytes
+            The snapshot.
+
+        Raises
+        ------
+        ValueError
+            When an agent is still deciding on an action.
+
+        Examples
+        --------
+        Run a world for 100 ticks, and branch two runs from there:
+
+        >>> world.initialize({"run_matrx_api": False})
+        >>> for _ in range(100):
+        >>>     world.step()
+        >>> snapshot = world.snapshot()
+        >>> branch_a = GridWorld.restore(snapshot)
+        >>> branch_b = GridWorld.restore(snapshot)
+        """
+        if len(self.__decision_deadlines) > 0 or len(self.__overrun_decisions) > 0:
+            raise ValueError(f"Cannot take a snapshot of GridWorld {self.world_id} while agents "
+                             f"{list(self.__decision_deadlines) + list(self.__overrun_decisions)} are still deciding.")
+        snapshot = io.BytesIO()
+        pickler = pickle.Pickler(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        pickler.dispatch_table = _SNAPSHOT_DISPATCH_TABLE
+        pickler.dump(self)
+        return snapshot.getvalue()
+
+    @staticmethod
+    def restore(snapshot):
+        """ Creates a GridWorld from a snapshot, see `snapshot`. The GridWorld continues from the tick at which the
+        snapshot was taken, with its own copies of all objects, agents and their brains.
+
+        Parameters
+        ----------
+        snapshot : bytes
+            The snapshot, as returned by `snapshot`.
+
+        Returns
+        -------
+        GridWorld
+            The restored GridWorld.
+
+        Raises
+        ------
+        ValueError
+            When the snapshot is not one of a GridWorld.
+        """
+        world = pickle.loads(snapshot)
+        if not isinstance(world, GridWorld):
+            raise ValueError(f"The given snapshot is not one of a {GridWorld.__name__}, but of {type(world)}.")
+        return world
+
+    def __getstate__(self):
+        """ Returns the state to pickle, see `snapshot`. The thread pool on which agents decide is created anew. """
+        state = self.__dict__.copy()
+        state["_GridWorld__decision_pool"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # The message manager tracks the agents through a view on our agents, which could not be pickled
+        self.message_manager.agents = self.__registered_agents.keys()
+        self.message_manager.chatrooms[0].agent_IDs = self.message_manager.agents
+        # The ticks are paced from a new schedule
+        self.__tick_scheduler.reset()
+
     def get_env_object(self, requested_id, obj_type=None):
         """ Fetch an object or agent from the GridWorld using its ID, optionally checking for its object type.
 
@@ -344,29 +598,134 @@ class GridWorld:
 
         """
 
-        env_objs = OrderedDict()
-        # loop through all environment objects
-        for obj_id, env_obj in self.__environment_objects.items():
-            # get the distance from the agent location to the object
-            coordinates = env_obj.location
-            distance = get_distance(coordinates, agent_loc)
+        # When a type is given, only the objects of that type are candidates, which we get from the type index
+        if object_type is None or object_type == "*":
+            candidate_ids = None
+            nr_candidates = len(self.__environment_objects) + len(self.__registered_agents)
+        else:
+            candidate_ids = self.__get_ids_of_type(object_type)
+            nr_candidates = len(candidate_ids)
+
+        # The grid functions as a spatial index with one bucket per cell. When the bounding box of the range covers
+        # more cells than there are candidates, it is cheaper to simply check every candidate. Without a type, all
+        # objects are candidates, which are checked at once using the object store.
+        if math.isinf(sense_range) or (2 * sense_range + 1) ** 2 > nr_candidates:
+            if candidate_ids is None:
+                objects = self.__object_store.objects
+                rows = self.__object_store.get_rows_in_range(agent_loc, None, sense_range)
+                return OrderedDict(objects[row] for row in rows)
+            candidates = self.__order_by_registration(candidate_ids)
+        else:
+            candidates = self.__get_objects_in_box(agent_loc, sense_range)
 
+        env_objs = OrderedDict()
+        for obj_id, env_obj in candidates:
             # check if the env object is of the specified type, and within range
             if (object_type is None or object_type == "*" or isinstance(env_obj, object_type)) and \
-                    distance <= sense_range:
+                    get_distance(env_obj.location, agent_loc) <= sense_range:
                 env_objs[obj_id] = env_obj
 
-        # agents are also environment objects, but stored separably. Also check them.
-        for agent_id, agent_obj in self.__registered_agents.items():
-            coordinates = agent_obj.location
-            distance = get_distance(coordinates, agent_loc)
-
-            # check if the env object is of the specified type, adn within range
-            if (object_type is None or object_type == "*" or isinstance(agent_obj, object_type)) and \
-                    distance <= sense_range:
-                env_objs[agent_id] = agent_obj
         return env_objs
 
+    def __get_objects_in_box(self, loc, box_range):
+        """ Returns (obj_id, obj) pairs of all objects and agents in the grid cells within the square of `box_range`
+        around `loc`. They are ordered as the environment objects followed by the agents, both in the order in which
+        they were registered, the same as iterating over `environment_objects` and `registered_agents`.
+        """
+        x_min = max(0, int(math.floor(loc[0] - box_range)))
+        x_max = min(self.__shape[0] - 1, int(math.floor(loc[0] + box_range)))
+        y_min = max(0, int(math.floor(loc[1] - box_range)))
+        y_max = min(self.__shape[1] - 1, int(math.floor(loc[1] + box_range)))
+        if x_min > x_max or y_min > y_max:
+            return []
+
+        obj_ids = [obj_id for cell in self.__grid[y_min:y_max + 1, x_min:x_max + 1].flat if cell is not None
+                   for obj_id in cell]
+
+        return self.__order_by_registration(obj_ids)
+
+    def __order_by_registration(self, obj_ids):
+        """ Returns (obj_id, obj) pairs of the given object and agent IDs, ordered as the environment objects followed
+        by the agents, both in the order in which they were registered.
+        """
+        found = []
+        for obj_id in obj_ids:
+            if obj_id in self.__environment_objects:
+                found.append((False, self.__registration_order[obj_id], obj_id, self.__environment_objects[obj_id]))
+            else:
+                found.append((True, self.__registration_order[obj_id], obj_id, self.__registered_agents[obj_id]))
+        found.sort(key=lambda x: (x[0], x[1]))
+
+        return [(obj_id, obj) for _, _, obj_id, obj in found]
+
+    def get_objects_of_type(self, object_type):
+        """ Get all objects and agents of a specific type.
+
+        Parameters
+        ----------
+        object_type : Class or tuple of Classes
+          The object class of which the objects-to-find should be an instance.
+
+        Returns
+        -------
+        obj : OrderedDict
+            Returns an ordereddict with the objects and agents of type `object_type`, in the order in which they were
+            registered. If no objects were found, the ordered dict is empty.
+
+        Examples
+        --------
+
+        In an action, world goal, or somewhere else with access to the Gridworld, the function can be used as
+        below.
+        In this example all doors in the world are returned.
+
+        >>> doors = grid_world.get_objects_of_type(Door)
+
+        """
+        return OrderedDict(self.__order_by_registration(self.__get_ids_of_type(object_type)))
+
+    def __get_ids_of_type(self, object_type):
+        """ Returns the set of IDs of all objects and agents that are an instance of `object_type`, using the type
+        index. Just as with `isinstance`, `object_type` may also be a tuple of classes.
+        """
+        if isinstance(object_type, tuple):
+            return set().union(*[self.__get_ids_of_type(obj_type) for obj_type in object_type])
+        return self.__type_index.get(object_type, set())
+
+    def __add_to_type_index(self, grid_obj):
+        """ Adds the object to the index of every class it inherits from. We use the actual class of the object
+        instead of its `class_inheritance` property, as the latter of an agent describes its brain instead of its body.
+        """
+        for cls in type(grid_obj).__mro__:
+            self.__type_index.setdefault(cls, set()).add(grid_obj.obj_id)
+
+    def __remove_from_type_index(self, grid_obj):
+        """ Removes the object from the index of every class it inherits from. """
+        for cls in type(grid_obj).__mro__:
+            if cls in self.__type_index:
+                self.__type_index[cls].discard(grid_obj.obj_id)
+
+    def get_intraversable_map(self):
+        """ Get which grid cells contain an intraversable object or agent.
+
+        Returns
+        -------
+        cells : ndarray
+            A boolean numpy array of shape y by x (the same as `grid`), which is True at each [y, x] location that
+            contains an intraversable object or agent.
+
+        Examples
+        --------
+
+        In an action, world goal, or somewhere else with access to the Gridworld, the function can be used as
+        below.
+        In this example we check whether the location [3,4] can be entered.
+
+        >>> can_enter = not grid_world.get_intraversable_map()[4, 3]
+
+        """
+        return self.__object_store.get_intraversable_map(self.__shape)
+
     def remove_from_grid(self, object_id, remove_from_carrier=True):
         """ Remove an object from the grid.
 
@@ -399,18 +758,26 @@ class GridWorld:
 
         # Remove object first from grid
         grid_obj = self.get_env_object(object_id)  # get the object
-        loc = grid_obj.location  # its location
-
-        self.__grid[loc[1], loc[0]].remove(grid_obj.obj_id)  # remove the object id from the list at that location
-        if len(self.__grid[loc[1], loc[0]]) == 0:  # if the list is empty, just add None there
-            self.__grid[loc[1], loc[0]] = None
+        self.__remove_from_grid_cell(grid_obj.obj_id, grid_obj.location)
+
+        # The object is no longer part of this world, so we no longer track its location changes
+        grid_obj._callback_location_changed = None
+        grid_obj._callback_properties_changed = None
+        self.__registration_order.pop(object_id, None)
+        self.__remove_from_type_index(grid_obj)
+        self.__agent_action_sets.pop(object_id, None)
+        self.__agent_brains.pop(object_id, None)
+        self.__object_store.objects_changed()
+        for goal in self.__incremental_goals:
+            goal.object_removed(grid_obj)
 
         # Remove object from the list of registered agents or environmental objects
         # Check if it is an agent
         if object_id in self.__registered_agents.keys():
             # Check if the agent was carrying something, if so remove property from carried item
-            for obj_id in self.__registered_agents[object_id].is_carrying:
-                self.__environment_objects[obj_id].carried_by.remove(object_id)
+            for carried_obj in self.__registered_agents[object_id].is_carrying:
+                carried_obj.carried_by = [carrier for carrier in carried_obj.carried_by if carrier != object_id]
+                self.__object_store.carried_by_changed(carried_obj.obj_id, carried_obj.carried_by)
 
             # Remove agent
             success = self.__registered_agents.pop(object_id,
@@ -424,8 +791,10 @@ class GridWorld:
                 for agent_id in self.__environment_objects[object_id].carried_by:
                     obj = self.__environment_objects[object_id]
                     self.__registered_agents[agent_id].is_carrying.remove(obj)
+                self.__object_store.carried_by_changed(object_id, [])
 
             # Remove object
+            self.__updated_objects.pop(object_id, None)
             success = self.__environment_objects.pop(object_id,
                                                      default=False)  # if it exists, we get it otherwise False
         else:
@@ -447,21 +816,24 @@ class GridWorld:
         from all agents to send which can be shown while waiting for the experiment leader to press play.
         """
 
-        for agent_id, agent_obj in self.__registered_agents.items():
-            # given the agent's capabilities, get everything the agent can perceive
-            state = self.__get_agent_state(agent_obj)
+        # In headless mode there is no api to prime
+        if not self.__headless:
+            perceptions = self.__perception.perceive(list(self.__registered_agents.values()))
+            for agent_id, agent_obj in self.__registered_agents.items():
+                # given the agent's capabilities, get everything the agent can perceive
+                state = self.__get_agent_state(agent_obj, perceptions[agent_id])
 
-            # filter other things from the agent state
-            filtered_agent_state = agent_obj.filter_observations(state)
+                # filter other things from the agent state, unless the agent brains are not used as we replay
+                filtered_agent_state = agent_obj.filter_observations(state) if self.__replay is None else state
 
-            # save the current agent's state for the api
-            api._add_state(agent_id=agent_id, state=filtered_agent_state,
-                          agent_inheritence_chain=agent_obj.class_inheritance,
-                          world_settings=api._MATRX_info)
+                # save the current agent's state for the api
+                api._add_state(agent_id=agent_id, state=filtered_agent_state,
+                              agent_inheritence_chain=agent_obj.class_inheritance,
+                              world_settings=api._MATRX_info)
 
-        # add god state
-        api._add_state(agent_id="god", state=self.__get_complete_state(), agent_inheritence_chain="god",
-                      world_settings=api._MATRX_info)
+            # add god state
+            api._add_state(agent_id="god", state=self.__get_complete_state(), agent_inheritence_chain="god",
+                          world_settings=api._MATRX_info)
 
         # initialize the message manager
         self.message_manager.agents = self.__registered_agents.keys()
@@ -469,7 +841,8 @@ class GridWorld:
 
         # make the information of this tick available via the api, after all
         # agents have been updated
-        api._next_tick()
+        if not self.__headless:
+            api._next_tick()
 
     def _register_agent(self, agent, agent_body: AgentBody):
         """ Register human agents and agents to the gridworld environment """
@@ -482,12 +855,24 @@ class GridWorld:
 
         # Add agent to registered agents
         self.__registered_agents[agent_body.obj_id] = agent_body
+        self.__agent_brains[agent_body.obj_id] = agent
+
+        # Add the agent to the grid and track its location from now on
+        self.__add_to_grid(agent_body)
+        self.__registration_order[agent_body.obj_id] = self.__nr_registrations
+        self.__nr_registrations += 1
+        self.__add_to_type_index(agent_body)
+        self.__object_store.objects_changed()
+        agent_body._callback_location_changed = self.__object_location_changed
+        agent_body._callback_properties_changed = self.__object_properties_changed
+        for goal in self.__incremental_goals:
+            goal.object_added(agent_body)
 
         if self.__verbose:
             print(f"@{os.path.basename(__file__)}: Created agent with id {agent_body.obj_id}.")
 
-        # Get all properties from the agent avatar
-        avatar_props = agent_body.properties
+        # Get all properties from the agent avatar, the agent receives its own copy as it may change them
+        avatar_props = agent_body.properties.copy()
 
         if agent_body.is_human_agent is False:
             agent._factory_initialise(agent_name=agent_body.obj_name,
@@ -521,6 +906,21 @@ class GridWorld:
         # Assign id to environment sparse dictionary grid
         self.__environment_objects[env_object.obj_id] = env_object
 
+        # Only objects that implement their own update method need to be updated each tick
+        if type(env_object).update is not EnvObject.update:
+            self.__updated_objects[env_object.obj_id] = env_object
+
+        # Add the object to the grid and track its location from now on
+        self.__add_to_grid(env_object)
+        self.__registration_order[env_object.obj_id] = self.__nr_registrations
+        self.__nr_registrations += 1
+        self.__add_to_type_index(env_object)
+        self.__object_store.objects_changed()
+        env_object._callback_location_changed = self.__object_location_changed
+        env_object._callback_properties_changed = self.__object_properties_changed
+        for goal in self.__incremental_goals:
+            goal.object_added(env_object)
+
         if self.__verbose:
             print(f"@{__file__}: Created an environment object with id {env_object.obj_id}.")
 
@@ -566,6 +966,11 @@ class GridWorld:
                 self.__teams[team] = []
             self.__teams[team].append(agent_id)
 
+    def _register_rooms(self, rooms: RoomRegistry):
+        """ Register the rooms of this world, which are given to all states as plain data in the world info (see
+        `RoomRegistry.room_info` and `State.get_room_registry`). """
+        self.__rooms = rooms
+
     def _register_logger(self, logger: GridWorldLogger):
         if self.__loggers is None:
             self.__loggers = [logger]
@@ -584,6 +989,30 @@ class GridWorld:
             raise BaseException(f"Object is not of type {str(type(EnvObject))} but of {str(type(grid_obj))} when adding"
                                 f" to grid in GridWorld.")
 
+    def __remove_from_grid_cell(self, obj_id, loc):
+        """ Removes an object ID from the list of IDs at the given location in the grid. """
+        self.__grid[loc[1], loc[0]].remove(obj_id)  # remove the object id from the list at that location
+        if len(self.__grid[loc[1], loc[0]]) == 0:  # if the list is empty, just add None there
+            self.__grid[loc[1], loc[0]] = None
+
+    def __object_location_changed(self, grid_obj, prev_loc):
+        """ Callback set in every registered object and agent, called when its location changed. Moves its ID from
+        the previous to the new location in the grid. """
+        with self.__measure("grid_updates"):
+            self.__remove_from_grid_cell(grid_obj.obj_id, prev_loc)
+            self.__add_to_grid(grid_obj)
+            self.__object_store.location_changed(grid_obj)
+        for goal in self.__incremental_goals:
+            goal.object_moved(grid_obj, prev_loc)
+
+    def __measure(self, phase, agent_id=None):
+        """ Returns a context manager that measures the time spent within it for the given phase of the tick (and
+        agent) when profiling, see `TickProfiler`. When not profiling, it does nothing.
+        """
+        if self.__profiler is None:
+            return _NO_MEASUREMENT
+        return self.__profiler.measure(phase, agent_id)
+
     def __validate_obj_placement(self, env_object):
         """
         Checks whether an object can be successfully placed on the grid
@@ -611,31 +1040,38 @@ class GridWorld:
 
     def __step(self):
 
-        # Set tick start of current tick
-        start_time_current_tick = datetime.datetime.now()
+        # Set tick start of current tick (not needed in headless mode, as we do not pace the ticks)
+        if not self.__headless:
+            start_time_current_tick = time.perf_counter()
+            self.__tick_scheduler.start_tick()
+
+        # Measure the whole tick, apart from the sleep at its end, when profiling
+        profile_start_time = time.perf_counter() if self.__profiler is not None else None
 
         # Get the world state
-        world_state = self.__get_complete_state()
+        with self.__measure("world_state"):
+            world_state = self.__get_complete_state()
 
         # Check if we are done based on our global goal assessment function
-        self.__is_done, goal_status = self.__check_simulation_goal(world_state)
+        with self.__measure("goal_checks"):
+            self.__is_done, goal_status = self.__check_simulation_goal(world_state)
 
         # Log the data if we have any loggers
-        for logger in self.__loggers:
-            agent_data_dict = {}
-            for agent_id, agent_body in self.__registered_agents.items():
-                agent_data_dict[agent_id] = agent_body.get_log_data()
-
-            # Check if the logger is an old or V2 version.
-            if isinstance(logger, GridWorldLoggerV2):
-                logger._grid_world_log(world_state=world_state, agent_data=agent_data_dict, grid_world=self,
-                                       last_tick=self.__is_done, goal_status=goal_status)
-            else:
-                logger._grid_world_log(agent_data=agent_data_dict, grid_world=self,
-                                       last_tick=self.__is_done, goal_status=goal_status)
+        with self.__measure("loggers"):
+            for logger in self.__loggers:
+                agent_data_dict = self.__get_agent_log_data()
+
+                # Check if the logger is an old or V2 version.
+                if isinstance(logger, GridWorldLoggerV2):
+                    logger._grid_world_log(world_state=world_state, agent_data=agent_data_dict, grid_world=self,
+                                           last_tick=self.__is_done, goal_status=goal_status)
+                else:
+                    logger._grid_world_log(agent_data=agent_data_dict, grid_world=self,
+                                           last_tick=self.__is_done, goal_status=goal_status)
 
-        # If this grid_world is done, we return immediately
+        # If this grid_world is done, we return immediately (after closing the tick of the profiler, as it is measured)
         if self.__is_done:
+            self.__end_profiled_tick(profile_start_time)
             return self.__is_done, 0.
 
         # initialize a temporary dictionary in which all states of this tick
@@ -660,97 +1096,89 @@ class GridWorld:
         # This blocks until a response from the agent is received (hence a tick can take longer than self.tick_
         # duration!!)
         action_buffer = OrderedDict()
+
+        # Compute what the agents perceive in one batch, for all agents whose perception is needed (see below). These
+        # perceptions are outdated when something moves while the agents decide, as tracked by the perception version.
+        with self.__measure("perception"):
+            perceiving_agents = [agent_obj for agent_obj in self.__registered_agents.values()
+                                 if self.__agent_state_is_used(agent_obj)]
+            perceptions = self.__perception.perceive(perceiving_agents)
+            perception_version = self.__perception.version
+
+        # When agents decide in parallel, their decisions are started here and processed later, in the order of
+        # registration. Before an agent's state is composed, the pending decisions of the agents it perceives (and of
+        # all agents before those) are processed, so it perceives their changes as when agents decide one after the
+        # other. Otherwise, each decision is processed directly.
+        pending_decisions = OrderedDict()
         for agent_id, agent_obj in self.__registered_agents.items():
 
-            state = self.__get_agent_state(agent_obj)
+            # The perception of a busy agent (or any agent when replaying) is only computed if anyone uses it
+            if not self.__agent_state_is_used(agent_obj):
+                state = None
+            else:
+                perceived = perceptions.get(agent_id) if self.__perception.version == perception_version else None
+                if len(pending_decisions) > 0:
+                    self.__process_pending_decisions(pending_decisions, perceived, all_agent_ids, world_state,
+                                                     action_buffer)
+                    if self.__perception.version != perception_version:
+                        perceived = None
+                with self.__measure("perception", agent_id):
+                    state = self.__get_agent_state(agent_obj, perceived)
 
             # check if this agent is busy performing an action , if so then also check if it as its last tick of waiting
             # because then we want to do that action. If not busy, call its get_action function.
+            filtered_agent_state = None
+            decision = None
             if agent_obj._check_agent_busy(curr_tick=self.__current_nr_ticks):
 
-                # only do the filter observation method to be able to update the agent's state to the api
-                filtered_agent_state = agent_obj.filter_observations(state)
+                # only do the filter observation method to be able to update the agent's state to the api. An agent
+                # that is still busy deciding (see the decision budget) is not disturbed, the api shows its perception.
+                # The same holds when replaying, as then the agent brains are not used.
+                if state is not None and (agent_id in self.__overrun_decisions or self.__replay is not None):
+                    filtered_agent_state = state
+                elif state is not None:
+                    with self.__measure("filter_observations", agent_id):
+                        filtered_agent_state = agent_obj.filter_observations(state)
 
                 # save the current agent's state for the api
                 if self.__run_matrx_api:
-                    api._add_state(agent_id=agent_id, state=filtered_agent_state,
-                                   agent_inheritence_chain=agent_obj.class_inheritance,
-                                   world_settings=world_state['World'])
+                    with self.__measure("api"):
+                        api._add_state(agent_id=agent_id, state=filtered_agent_state,
+                                       agent_inheritence_chain=agent_obj.class_inheritance,
+                                       world_settings=world_state['World'])
 
             else:  # agent is not busy
+                decision = self.__start_decision(agent_id, agent_obj, state)
 
-                # Any received data from the api for this HumanAgent is send along to the get_action function
-                if agent_obj.is_human_agent:
-                    usrinp = None
-                    if self.__run_matrx_api and agent_id in api._userinput:
-                        usrinp = api._pop_userinput(agent_id)
-
-                    filtered_agent_state, agent_properties, action_class_name, action_kwargs = \
-                        agent_obj.get_action_func(state=state, agent_properties=agent_obj.properties, agent_id=agent_id,
-                                                  user_input=usrinp)
-                else:  # not a HumanAgent
-
-                    # perform the agent's get_action method (goes through filter_observations and decide_on_action)
-                    filtered_agent_state, agent_properties, action_class_name, action_kwargs = agent_obj.get_action_func(
-                        state=state, agent_properties=agent_obj.properties, agent_id=agent_id)
-
-                # the Agent (in the OODA loop) might have updated its properties, process these changes in the Avatar
-                # Agent
-                agent_obj._set_agent_changed_properties(agent_properties)
-
-                # Set the agent to busy, we do this only here and not when the agent was already busy to prevent the
-                # agent to perform an action with a duration indefinitely (and since all actions have a duration, that
-                # would be killing...)
-                self.__set_agent_busy(action_name=action_class_name, action_kwargs=action_kwargs, agent_id=agent_id)
-
-            # Obtain all communication messages if the agent has something to say to others
-            agent_messages = agent_obj.get_messages_func(all_agent_ids)
-
-            # add any messages received from the api sent by this agent
-            if self.__run_matrx_api:
-                if agent_id in api._received_messages:
-                    agent_messages += copy.copy(api._received_messages[agent_id])
-
-                    # clear the messages for the next tick
-                    del api._received_messages[agent_id]
-
-            # preprocess all messages of the current tick of this agent
-            self.message_manager.preprocess_messages(self.__current_nr_ticks, agent_messages,
-                                                        all_agent_ids, self.__teams)
-
-            # save the current agent's state for the api
-            if self.__run_matrx_api:
-                api._add_state(agent_id=agent_id, state=filtered_agent_state,
-                               agent_inheritence_chain=agent_obj.class_inheritance,
-                               world_settings=world_state['World'])
+            if self.__decision_threads is None:
+                self.__process_agent_decision(agent_id, agent_obj, filtered_agent_state, decision, all_agent_ids,
+                                              world_state, action_buffer)
+            else:
+                pending_decisions[agent_id] = (agent_obj, filtered_agent_state, decision)
 
-            # if this agent is at its last tick of waiting on its action duration, we want to actually perform the
-            # action
-            if agent_obj._at_last_action_duration_tick(curr_tick=self.__current_nr_ticks):
-                # Get the action and arguments
-                action_class_name, action_kwargs = agent_obj._get_duration_action()
-                # store the action in the buffer
-                action_buffer[agent_id] = (action_class_name, action_kwargs)
+        self.__process_pending_decisions(pending_decisions, None, all_agent_ids, world_state, action_buffer)
 
         # put all messages of the current tick in the message buffer
-        if self.__current_nr_ticks in self.message_manager.preprocessed_messages:
-            for mssg in self.message_manager.preprocessed_messages[self.__current_nr_ticks]:
-                if mssg.to_id not in self.__message_buffer.keys():  # first message for this receiver
-                    self.__message_buffer[mssg.to_id] = [mssg]
-                else:
-                    self.__message_buffer[mssg.to_id].append(mssg)
+        with self.__measure("messages"):
+            if self.__current_nr_ticks in self.message_manager.preprocessed_messages:
+                for mssg in self.message_manager.preprocessed_messages[self.__current_nr_ticks]:
+                    if mssg.to_id not in self.__message_buffer.keys():  # first message for this receiver
+                        self.__message_buffer[mssg.to_id] = [mssg]
+                    else:
+                        self.__message_buffer[mssg.to_id].append(mssg)
 
         # save the god view state
         if self.__run_matrx_api:
-            api._add_state(agent_id="god", state=world_state, agent_inheritence_chain="god",
-                           world_settings=world_state['World'])
+            with self.__measure("api"):
+                api._add_state(agent_id="god", state=world_state, agent_inheritence_chain="god",
+                               world_settings=world_state['World'])
 
-            # make the information of this tick available via the api, after all
-            # agents have been updated
-            api._current_tick = self.__current_nr_ticks
-            api._next_tick()
-            self.__tick_duration = api.tick_duration
-            api._grid_size = self.shape
+                # make the information of this tick available via the api, after all
+                # agents have been updated
+                api._current_tick = self.__current_nr_ticks
+                api._next_tick()
+                self.__tick_duration = api.tick_duration
+                api._grid_size = self.shape
 
         # Perform the actions in the order of the action_buffer (which is filled in order of registered agents
         for agent_id, action in action_buffer.items():
@@ -762,94 +1190,312 @@ class GridWorld:
             if action_kwargs is None:  # If kwargs is none, make an empty dict out of it
                 action_kwargs = {}
 
-            # Actually perform the action (if possible), also sets the result in the agent's brain
-            self.__perform_action(agent_id, action_class_name, action_kwargs, world_state)
-
-            # Update the grid
-            self.__update_grid()
+            # Actually perform the action (if possible), also sets the result in the agent's brain (unless we replay).
+            # The grid is updated by the objects themselves whenever their location changes.
+            with self.__measure("actions", agent_id):
+                self.__perform_action(agent_id, action_class_name, action_kwargs, world_state)
 
-        # Send all messages between agents
-        for receiver_id, messages in self.__message_buffer.items():
-            # check if the receiver exists
-            if receiver_id in self.__registered_agents.keys():
-                # Call the callback method that sets the messages
-                self.__registered_agents[receiver_id].set_messages_func(messages)
+        # Send all messages between agents, except when replaying as then the agent brains are not used
+        with self.__measure("messages"):
+            for receiver_id, messages in self.__message_buffer.items():
+                # check if the receiver exists
+                if receiver_id in self.__registered_agents.keys() and self.__replay is None:
+                    # Call the callback method that sets the messages
+                    self.__registered_agents[receiver_id].set_messages_func(messages)
 
         self.__message_buffer = {}
 
-        # Perform the update method of all objects
-        compl_state = self.__get_complete_state()
-        for env_obj in self.__environment_objects.values():
-            env_obj.update(self, compl_state)
+        # Perform the update method of all objects that implement one and are due this tick
+        self.__update_objects(world_state)
 
         # Increment the number of tick we performed
         self.__current_nr_ticks += 1
 
-        # Check how much time the tick lasted already
-        tick_end_time = datetime.datetime.now()
-        tick_duration = tick_end_time - start_time_current_tick
-        self.sleep_duration = self.__tick_duration - tick_duration.total_seconds()
+        # Add the measurements of this tick to the statistics of the profiler
+        self.__end_profiled_tick(profile_start_time)
 
-        # Sleep for the remaining time of self.__tick_duration
+        # In headless mode we run as fast as possible, so we do not time or sleep
+        if self.__headless:
+            return self.__is_done, 0.
+
+        # Check how much time is left until the deadline of this tick, the tick duration may be changed via the api
+        self.__tick_scheduler.tick_duration = self.__tick_duration
+        self.sleep_duration = self.__tick_scheduler.time_left()
+
+        # Sleep until the deadline of this tick
         self.__sleep()
 
         # Compute the total time of our tick (including potential sleep)
-        tick_end_time = datetime.datetime.now()
-        tick_duration = tick_end_time - start_time_current_tick
-        self.__curr_tick_duration = tick_duration.total_seconds()
+        self.__curr_tick_duration = time.perf_counter() - start_time_current_tick
 
         if self.__verbose:
-            print(f"@{os.path.basename(__file__)}: Tick {self.__current_nr_ticks} took {tick_duration.total_seconds()} "
+            print(f"@{os.path.basename(__file__)}: Tick {self.__current_nr_ticks} took {self.__curr_tick_duration} "
                   f"seconds.")
 
         return self.__is_done, self.__curr_tick_duration
 
+    def __end_profiled_tick(self, profile_start_time):
+        """ Adds the complete tick and its measurements to the statistics of the profiler, when profiling. """
+        if self.__profiler is None:
+            return
+        self.__profiler.add("tick", time.perf_counter() - profile_start_time)
+        self.__profiler.end_tick()
+
+    def __start_decision(self, agent_id, agent_obj, state):
+        """ Lets the agent decide on an action through its get_action function (which goes through filter_observations
+        and decide_on_action). Returns the result of that function, or a Future of it when agents decide in parallel
+        or with a decision budget. When replaying, the recorded decision is returned instead.
+        """
+        if self.__replay is not None:
+            return self.__get_replayed_decision(agent_id, state)
+
+        # An agent whose previous decision exceeded the budget does not decide again until that decision is done
+        if agent_id in self.__overrun_decisions:
+            overrun_decision, given_properties = self.__overrun_decisions[agent_id]
+            if not overrun_decision.done():
+                return self.__get_overrun_decision(agent_obj, state)
+
+            # The late decision is only used with the "apply_next_tick" policy, but any exception it raised is raised.
+            # As the agent's properties may have changed since, only those the agent changed itself are applied.
+            del self.__overrun_decisions[agent_id]
+            filtered_state, agent_properties, action_class_name, action_kwargs = overrun_decision.result()
+            if self.__overrun_policy == "apply_next_tick":
+                agent_properties = {prop: value for prop, value in agent_properties.items()
+                                    if prop not in given_properties or given_properties[prop] != value}
+                return filtered_state, agent_properties, action_class_name, action_kwargs
+
+        # The agent receives its own copy of its properties, as it changes them by changing that dictionary
+        decision_kwargs = {"state": state, "agent_properties": agent_obj.properties.copy(), "agent_id": agent_id}
+
+        # Any received data from the api for this HumanAgent is send along to the get_action function
+        if agent_obj.is_human_agent:
+            usrinp = None
+            if self.__run_matrx_api and agent_id in api._userinput:
+                usrinp = api._pop_userinput(agent_id)
+            decision_kwargs["user_input"] = usrinp
+
+        if self.__decision_threads is None and self.__decision_budget is None:
+            return self.__decide(agent_id, agent_obj, decision_kwargs)
+
+        # With a budget, enough threads are needed for agents that still decide in the background
+        if self.__decision_pool is None:
+            nr_threads = self.__decision_threads if self.__decision_threads is not None \
+                else len(self.__registered_agents)
+            self.__decision_pool = ThreadPoolExecutor(max_workers=max(1, nr_threads))
+        if self.__decision_budget is not None:
+            self.__decision_deadlines[agent_id] = (time.perf_counter() + self.__decision_budget, state,
+                                                   decision_kwargs["agent_properties"])
+        return self.__decision_pool.submit(self.__decide, agent_id, agent_obj, decision_kwargs)
+
+    def __get_replayed_decision(self, agent_id, state):
+        """ Returns the decision the agent made in this tick of the replayed run, in the same form as the decisions of
+        agents. As the agent does not filter its state, its (unfiltered) state is used for the api. When the agent did
+        not decide in this tick of the recording, it idles.
+        """
+        decision = self.__replay.get_decision(self.__current_nr_ticks, agent_id)
+        if decision is None:
+            return state, None, None, {}
+        changed_properties, action_class_name, action_kwargs = decision
+        return state, changed_properties, action_class_name, copy.copy(action_kwargs)
+
+    def __await_decision(self, agent_id, agent_obj, decision):
+        """ Waits for the Future of a decision of an agent and returns it. When the decision exceeds the decision budget
+        (if any), the agent's overrun is counted and the decision of the overrun policy is returned instead.
+        """
+        if agent_id not in self.__decision_deadlines:
+            return decision.result()
+
+        deadline, state, agent_properties = self.__decision_deadlines.pop(agent_id)
+        try:
+            return decision.result(timeout=max(0., deadline - time.perf_counter()))
+        except TimeoutError:
+            self.__overrun_decisions[agent_id] = (decision, agent_properties)
+            self.__decision_overruns[agent_id] = self.__decision_overruns.get(agent_id, 0) + 1
+            if self.__verbose:
+                print(f"@{os.path.basename(__file__)}: Agent {agent_id} exceeded its decision budget of "
+                      f"{self.__decision_budget} seconds.")
+            return self.__get_overrun_decision(agent_obj, state)
+
+    def __get_overrun_decision(self, agent_obj, state):
+        """ Returns the decision of an agent that is still deciding, according to the overrun policy. As the agent did
+        not filter its state, its (unfiltered) state is used for the api. Its properties remain unchanged.
+        """
+        if self.__overrun_policy == "reuse_last_action" and agent_obj.current_action is not None:
+            action_kwargs = agent_obj.current_action_args if agent_obj.current_action_args is not None else {}
+            return state, None, agent_obj.current_action, action_kwargs
+        return state, None, None, {}
+
+    def __decide(self, agent_id, agent_obj, decision_kwargs):
+        """ Calls the get_action function of the agent with the given arguments, and returns its result. When profiling,
+        the time its brain reports for its `filter_observations` and `decide_on_action` is added to those phases, and
+        the remainder to "agent_decisions".
+        """
+        with self.__measure("agent_decisions", agent_id):
+            decision = agent_obj.get_action_func(**decision_kwargs)
+            durations = getattr(self.__agent_brains.get(agent_id), "decision_durations", None)
+            if self.__profiler is not None and durations is not None:
+                self.__profiler.add("filter_observations", durations[0], agent_id)
+                self.__profiler.add("decide_on_action", durations[1], agent_id)
+        return decision
+
+    def __process_pending_decisions(self, pending_decisions, perceived, all_agent_ids, world_state, action_buffer):
+        """ Processes the pending decisions of agents that decide in parallel, in the order of registration, up to and
+        including that of the last agent in the given perception. When no perception is given, all pending decisions
+        are processed.
+        """
+        if perceived is None:
+            nr_to_process = len(pending_decisions)
+        else:
+            perceived_ids = {obj_id for obj_id, _ in perceived}
+            nr_to_process = 0
+            for idx, agent_id in enumerate(pending_decisions.keys()):
+                if agent_id in perceived_ids:
+                    nr_to_process = idx + 1
+
+        for _ in range(nr_to_process):
+            agent_id, (agent_obj, filtered_agent_state, decision) = pending_decisions.popitem(last=False)
+            self.__process_agent_decision(agent_id, agent_obj, filtered_agent_state, decision, all_agent_ids,
+                                          world_state, action_buffer)
+
+    def __process_agent_decision(self, agent_id, agent_obj, filtered_agent_state, decision, all_agent_ids,
+                                 world_state, action_buffer):
+        """ Processes the decision of the agent (if it made one this tick), its messages and the action it should
+        perform this tick (if any).
+        """
+        if decision is not None:
+            if isinstance(decision, Future):
+                decision = self.__await_decision(agent_id, agent_obj, decision)
+            filtered_agent_state, agent_properties, action_class_name, action_kwargs = decision
+
+            # Only the properties the agent changed are recorded, as those suffice to apply its changes when replaying
+            if self.__action_recorder is not None:
+                changed_properties = None
+                if agent_properties is not None:
+                    body_properties = agent_obj.properties
+                    changed_properties = {prop: value for prop, value in agent_properties.items()
+                                          if prop not in body_properties or body_properties[prop] != value}
+                self.__action_recorder._record_decision(self.__current_nr_ticks, agent_id, changed_properties,
+                                                        action_class_name, action_kwargs)
+
+            # the Agent (in the OODA loop) might have updated its properties, process these changes in the Avatar
+            # Agent. There are no properties when the agent did not decide in time.
+            if agent_properties is not None:
+                agent_obj._set_agent_changed_properties(agent_properties)
+
+            # Set the agent to busy, we do this only here and not when the agent was already busy to prevent the
+            # agent to perform an action with a duration indefinitely (and since all actions have a duration, that
+            # would be killing...)
+            self.__set_agent_busy(action_name=action_class_name, action_kwargs=action_kwargs, agent_id=agent_id)
+
+        with self.__measure("messages", agent_id):
+            # Obtain all communication messages if the agent has something to say to others, unless it is still
+            # deciding (see the decision budget), as its messages may still change. When replaying, the agent sends
+            # the messages it sent in the recorded run (including those sent via the api).
+            if agent_id in self.__overrun_decisions:
+                agent_messages = []
+            elif self.__replay is not None:
+                agent_messages = self.__replay.get_messages(self.__current_nr_ticks, agent_id)
+            else:
+                agent_messages = agent_obj.get_messages_func(all_agent_ids)
+
+            # add any messages received from the api sent by this agent
+            if self.__run_matrx_api and self.__replay is None:
+                if agent_id in api._received_messages:
+                    agent_messages += copy.copy(api._received_messages[agent_id])
+
+                    # clear the messages for the next tick
+                    del api._received_messages[agent_id]
+
+            if self.__action_recorder is not None:
+                self.__action_recorder._record_messages(self.__current_nr_ticks, agent_id, agent_messages)
+
+            # preprocess all messages of the current tick of this agent
+            self.message_manager.preprocess_messages(self.__current_nr_ticks, agent_messages,
+                                                     all_agent_ids, self.__teams)
+
+        # save the current agent's state for the api
+        if self.__run_matrx_api:
+            with self.__measure("api"):
+                api._add_state(agent_id=agent_id, state=filtered_agent_state,
+                               agent_inheritence_chain=agent_obj.class_inheritance,
+                               world_settings=world_state['World'])
+
+        # if this agent is at its last tick of waiting on its action duration, we want to actually perform the
+        # action
+        if agent_obj._at_last_action_duration_tick(curr_tick=self.__current_nr_ticks):
+            # Get the action and arguments
+            action_class_name, action_kwargs = agent_obj._get_duration_action()
+            # store the action in the buffer
+            action_buffer[agent_id] = (action_class_name, action_kwargs)
+
     def __check_simulation_goal(self, world_state):
 
         goal_status = {}
         if self.__simulation_goal is not None:
             if isinstance(self.__simulation_goal, (list, tuple)):  # edited this check to include tuples
                 for sim_goal in self.__simulation_goal:
-
-                    # Check if the goal is a new V2 goal
-                    if isinstance(sim_goal, WorldGoalV2):
-                        is_done = sim_goal.goal_reached(world_state, self)
-                    else:
-                        is_done = sim_goal.goal_reached(self)
-
                     # Store goal status
-                    goal_status[sim_goal] = is_done
+                    goal_status[sim_goal] = self.__check_goal(sim_goal, world_state)
             else:
-                # Check if the goal is a new V2 goal
-                if isinstance(self.__simulation_goal, WorldGoalV2):
-                    is_done = self.__simulation_goal.goal_reached(world_state, self)
-                else:
-                    is_done = self.__simulation_goal.goal_reached(self)
-                goal_status[self.__simulation_goal] = is_done
+                goal_status[self.__simulation_goal] = self.__check_goal(self.__simulation_goal, world_state)
 
-        is_done = np.array(list(goal_status.values())).all()
+        is_done = all(goal_status.values())
         return is_done, goal_status
 
+    def __check_goal(self, sim_goal, world_state):
+        """ Returns whether the given goal is reached. Incremental goals are only checked when objects relevant to
+        them changed, otherwise their previous result is returned. """
+        if isinstance(sim_goal, IncrementalGoal) and not sim_goal.needs_check():
+            return sim_goal.is_done
+
+        # Check if the goal is a new V2 goal
+        if isinstance(sim_goal, WorldGoalV2):
+            return sim_goal.goal_reached(world_state, self)
+        return sim_goal.goal_reached(self)
+
+    def __update_objects(self, world_state):
+        """
+        Calls the update method of the environment objects that override EnvObject.update, but only of those that are
+        due this tick according to their update_interval. They receive the given complete state of this tick if no
+        object or agent changed since, otherwise it is composed anew (only if any object is due).
+        :return:
+        """
+        due_objects = [(obj_id, env_obj) for obj_id, env_obj in self.__updated_objects.items()
+                       if env_obj.update_interval <= 1 or self.__current_nr_ticks % env_obj.update_interval == 0]
+        if len(due_objects) == 0:
+            return
+
+        with self.__measure("world_state"):
+            compl_state = world_state if self.__is_current_state(world_state) else self.__get_complete_state()
+        with self.__measure("env_object_updates"):
+            for obj_id, env_obj in due_objects:
+                # Skip objects removed by the update of another object
+                if obj_id in self.__updated_objects:
+                    env_obj.update(self, compl_state)
+
+    def __is_current_state(self, state):
+        """ Returns whether the given complete state still contains the current properties of all objects and agents,
+        i.e. none was added, removed or changed since it was composed. As their properties are snapshots that are only
+        composed anew when they change, this compares whether the state contains those same snapshots. """
+        state_dict = state.as_dict()
+        if len(state_dict) != len(self.__environment_objects) + len(self.__registered_agents) + 1:
+            return False
+        for objects in (self.__environment_objects, self.__registered_agents):
+            for obj_id, obj in objects.items():
+                if state_dict.get(obj_id) is not obj.properties:
+                    return False
+        return True
+
     def __sleep(self):
         """
-        Sleeps the current python process for the amount of time that is left after self.curr_tick_duration up to
-        in self.__tick_duration
+        Sleeps the current python process until the deadline of the current tick, as scheduled by the tick scheduler.
         :return:
         """
-        if self.sleep_duration > 0:
-            gevent.sleep(self.sleep_duration)
-        else:
+        if not self.__tick_scheduler.wait():
             self.__warn(
                 f"The average tick took longer than the set tick duration of {self.__tick_duration}. "
                 f"Program is to heavy to run real time")
 
-    def __update_grid(self):
-        self.__grid = np.array([[None for _ in range(self.__shape[0])] for _ in range(self.__shape[1])])
-        for obj_id, obj in self.__environment_objects.items():
-            self.__add_to_grid(obj)
-        for agent_id, agent in self.__registered_agents.items():
-            self.__add_to_grid(agent)
-
     # get all objects and agents on the grid
     def __get_complete_state(self):
         """
@@ -857,95 +1503,150 @@ class GridWorld:
         :return: state with all objects and agents on the grid
         """
 
-        # create a state dict with all objects and agents
+        # create a state dict with all objects and agents. Their properties are snapshots that are only composed anew
+        # when they changed.
         state_dict = {}
         for obj_id, obj in self.__environment_objects.items():
             state_dict[obj.obj_id] = obj.properties
         for agent_id, agent in self.__registered_agents.items():
             state_dict[agent.obj_id] = agent.properties
 
-        # Create State
-        state = State(own_id=None)
-        state.state_update(state_dict)
-
         # Append generic properties (e.g. number of ticks, size of grid, etc.}
-        world_info = {
+        state_dict["World"] = {
             "nr_ticks": self.__current_nr_ticks,
             "curr_tick_timestamp": int(round(time.time() * 1000)),
             "grid_shape": self.__shape,
             "tick_duration": self.tick_duration,
             "world_ID": self.world_id,
+            "rooms": self.__rooms.room_info,
             "vis_settings": {
                 "vis_bg_clr": self.__visualization_bg_clr,
                 "vis_bg_img": self.__visualization_bg_img
             }
         }
 
-        # Add world info to State
-        state._add_world_info(world_info)
+        # Create State, which takes the dictionary as is
+        state = State(own_id=None)
+        state.state_update(state_dict)
 
         return state
 
-    def __get_agent_state(self, agent_obj: AgentBody):
-        agent_loc = agent_obj.location
-        sense_capabilities = agent_obj.sense_capability.get_capabilities()
-
-        # Check if sense capabilities contains the "*" wildcard. If so we store
-        # those objects separately, in case there are also other types specified
-        # whose range precedes that of the "*" wildcard. For example, when an
-        # agent can perceive other agents within a certain range and also has
-        # the "*" wildcard to denote all OTHER objects. In that case we should
-        # ignore all the AgentBody objects in the "*"-range. and then add all
-        # the AgentBody objects we can see with the "AgentBody"-range.
-        wildcard_objs = {}
-        objs_in_range = OrderedDict()
-        if "*" in sense_capabilities.keys():
-            wildcard_objs = self.get_objects_in_range(agent_loc, "*", sense_capabilities["*"])
-            sense_capabilities.pop("*")  # we did the wildcard already
-
-        # Check which objects can be sensed with the agents' capabilities, from
-        # its current position.
-        for obj_type, sense_range in sense_capabilities.items():
-            env_objs = self.get_objects_in_range(agent_loc, obj_type, sense_range)
-            objs_in_range.update(env_objs)
-
-        # Merge the wildcard objects with those of the (potential) other objects,
-        # where we ignore all wildcard objects that are of a specific given type
-        # with its own range.
-        for wildcard_obj_id, wildcard_obj in wildcard_objs.items():
-            if type(wildcard_obj) not in sense_capabilities.keys():
-                objs_in_range[wildcard_obj_id] = wildcard_obj
+    def __object_properties_changed(self, env_obj):
+        """ Called by a registered object or agent whenever one of its properties changed, updates its attributes in the
+        object store.
+        """
+        self.__object_store.properties_changed(env_obj)
+        for goal in self.__incremental_goals:
+            goal.object_changed(env_obj)
+
+    def __agent_state_is_used(self, agent_obj):
+        """ Returns whether the perception of an agent needs to be computed this tick. This is the case when the agent
+        decides on an action, or when it is busy but its perception is used anyway. When replaying, agents do not
+        decide, so only the API uses their perception.
+        """
+        if self.__replay is not None:
+            return self.__run_matrx_api
+        return not agent_obj._is_busy(curr_tick=self.__current_nr_ticks) or self.__busy_agent_state_is_used(agent_obj)
+
+    def __get_agent_log_data(self):
+        """ Returns the log data of every agent for the loggers, agent IDs as keys. When replaying, the recorded log data
+        is used instead (an empty dictionary if there is none).
+        """
+        agent_data_dict = {}
+        for agent_id, agent_body in self.__registered_agents.items():
+            if self.__replay is not None:
+                log_data = self.__replay.get_log_data(self.__current_nr_ticks, agent_id)
+                agent_data_dict[agent_id] = copy.deepcopy(log_data) if log_data is not None else {}
+                continue
+            agent_data_dict[agent_id] = agent_body.get_log_data()
+            if self.__action_recorder is not None:
+                self.__action_recorder._record_log_data(self.__current_nr_ticks, agent_id, agent_data_dict[agent_id])
+        return agent_data_dict
+
+    def __busy_agent_state_is_used(self, agent_obj):
+        """ Returns whether the perception of a busy agent is used, in which case it needs to be computed even though
+        the agent does not decide on an action. This is the case when the API shows it, when its brain needs it (see
+        `AgentBrain.needs_perception_when_busy`), or when a logger uses it (see
+        `GridWorldLoggerV2.agents_needing_perception`).
+        """
+        brain = self.__agent_brains.get(agent_obj.obj_id)
+        if self.__run_matrx_api or getattr(brain, "needs_perception_when_busy", True):
+            return True
+        for logger in self.__loggers:
+            agents = getattr(logger, "agents_needing_perception", ())
+            if agents == "*" or agent_obj.obj_id in agents or agent_obj.obj_name in agents:
+                return True
+        return False
+
+    def __get_agent_state(self, agent_obj: AgentBody, perceived=None):
+        # Get the (obj_id, obj) pairs of all objects the agent can perceive with its sense capabilities from its current
+        # position, if not already given. The perception engine also takes care of the "*" wildcard; it denotes all
+        # OTHER objects than those whose type has its own range. For example, when an agent can perceive other agents
+        # within a certain range and also has the "*" wildcard, all the AgentBody objects in the "*"-range are ignored
+        # and only those within the "AgentBody"-range are perceived.
+        if perceived is None:
+            perceived = self.__perception.perceive([agent_obj])[agent_obj.obj_id]
 
         state_dict = {}
         # Save all properties of the sensed objects in a state dictionary
-        for env_obj in objs_in_range:
-            state_dict[env_obj] = objs_in_range[env_obj].properties
-
-        # Create State object out of state dict
-        state = State(agent_obj.obj_id)
-        state.state_update(state_dict)
+        for obj_id, env_obj in perceived:
+            state_dict[obj_id] = env_obj.properties
 
         # Append generic properties (e.g. number of ticks, fellow team members, etc.}
         team_members = [agent_id for agent_id, other_agent in self.__registered_agents.items()
                         if agent_obj.team == other_agent.team]
-        world_info = {
+        state_dict["World"] = {
             "nr_ticks": self.__current_nr_ticks,
             "curr_tick_timestamp": int(round(time.time() * 1000)),
             "grid_shape": self.__shape,
             "tick_duration": self.tick_duration,
             "team_members": team_members,
             "world_ID": self.world_id,
+            "rooms": self.__rooms.room_info,
             "vis_settings": {
                 "vis_bg_clr": self.__visualization_bg_clr,
                 "vis_bg_img": self.__visualization_bg_img
             }
         }
 
-        # Add it to State
-        state._add_world_info(world_info)
+        # Create State object out of state dict, which takes the dictionary as is
+        state = State(agent_obj.obj_id)
+        state.state_update(state_dict)
 
         return state
 
+    def __build_action_registry(self):
+        """ Creates a single instance of every known action and stores its default duration. Actions that can not be
+        created without arguments are skipped here, and are instead created (and fail) when an agent uses them.
+        """
+        for action_name, action_class in self.__all_actions.items():
+            try:
+                action = action_class()
+            except TypeError:
+                continue
+            self.__action_handlers[action_name] = action
+            self.__action_durations[action_name] = action.duration_in_ticks
+
+    def __get_action_handler(self, action_name):
+        """ Returns the reusable instance of the action with the given name, creating it if it is not known yet. """
+        action = self.__action_handlers.get(action_name)
+        if action is None:
+            action = self.__all_actions[action_name]()
+            self.__action_handlers[action_name] = action
+            self.__action_durations[action_name] = action.duration_in_ticks
+        return action
+
+    def __agent_is_capable(self, agent_id, action_name):
+        """ Returns whether the action is in the action set of the agent. The action set is kept as a set for fast
+        lookups, which is renewed whenever the agent's action set is replaced or changes in size.
+        """
+        action_set = self.__registered_agents[agent_id].action_set
+        cached = self.__agent_action_sets.get(agent_id)
+        if cached is None or cached[0] is not action_set or len(cached[0]) != cached[2]:
+            cached = (action_set, set(action_set), len(action_set))
+            self.__agent_action_sets[agent_id] = cached
+        return action_name in cached[1]
+
     def __check_action_is_possible(self, agent_id, action_name, action_kwargs, world_state):
         # If the action_name is None, the agent idles
         if action_name is None:
@@ -958,16 +1659,13 @@ class GridWorld:
             return result
 
         # action known, but agent not capable of performing it
-        elif action_name in self.__all_actions.keys() and \
-                action_name not in self.__registered_agents[agent_id].action_set:
+        elif action_name in self.__all_actions and not self.__agent_is_capable(agent_id, action_name):
             result = ActionResult(ActionResult.AGENT_NOT_CAPABLE, succeeded=False)
 
         # Check if action is known
-        elif action_name in self.__all_actions.keys():
-            # Get action class
-            action_class = self.__all_actions[action_name]
-            # Make instance of action
-            action = action_class()
+        elif action_name in self.__all_actions:
+            # Get the reusable instance of the action
+            action = self.__get_action_handler(action_name)
             # Check if action is possible, if so we can perform the action otherwise we send an ActionResult that it was
             # not possible.
             result = action.is_possible(self, agent_id, world_state=world_state, **action_kwargs)
@@ -991,21 +1689,17 @@ class GridWorld:
             if action_name is None:
                 return result
 
-            # Get action class
-            action_class = self.__all_actions[action_name]
-            # Make instance of action
-            action = action_class()
+            # Get the reusable instance of the action
+            action = self.__get_action_handler(action_name)
             # Apply world mutation
             result = action.mutate(self, agent_id, world_state=world_state, **action_kwargs)
 
-            # Update the grid
-            self.__update_agent_location(agent_id)
-
         # Get agent's send_result function
         set_action_result = self.__registered_agents[agent_id].set_action_result_func
 
-        # Send result of mutation to agent
-        set_action_result(result)
+        # Send result of mutation to agent, unless we replay as then the agent brains are not used
+        if self.__replay is None:
+            set_action_result(result)
 
         # Whether the action succeeded or not, we return the result
         return result
@@ -1018,14 +1712,11 @@ class GridWorld:
 
         else:  # action is not None
 
-            # Get action class
-            action_class = self.__all_actions[action_name]
-            # Make instance of action
-            action = action_class()
-
             # Obtain the duration of the action, defaults to the one of the action class if not in action_kwargs, and
             # otherwise that of Action
-            duration_in_ticks = action.duration_in_ticks
+            if action_name not in self.__action_durations:
+                self.__get_action_handler(action_name)
+            duration_in_ticks = self.__action_durations[action_name]
             if "action_duration" in action_kwargs.keys():
                 duration_in_ticks = action_kwargs["action_duration"]
 
@@ -1043,25 +1734,6 @@ class GridWorld:
         # to its properties so others know what agent did)
         self.__registered_agents[agent_id]._set_current_action(action_name=action_name, action_args=action_kwargs)
 
-    def __update_agent_location(self, agent_id):
-        # Get current location of the agent
-        loc = self.__registered_agents[agent_id].location
-        # Check if that spot in our list that represents the grid, is None or a list of other objects
-        if self.__grid[loc[1], loc[0]] is not None:  # If not None, we append the agent id to it
-            self.__grid[loc[1], loc[0]].append(agent_id)
-        else:  # if none, we make a new list with the agent id in it.
-            self.__grid[loc[1], loc[0]] = [agent_id]
-
-        # Update the Agent Avatar's location as well
-        self.__registered_agents[agent_id].location = loc
-
-    def __update_obj_location(self, obj_id):
-        loc = self.__environment_objects[obj_id].location
-        if self.__grid[loc[1], loc[0]] is not None:
-            self.__grid[loc[1], loc[0]].append(obj_id)
-        else:
-            self.__grid[loc[1], loc[0]] = [obj_id]
-
     def __warn(self, warn_str):
         return f"[@{self.__current_nr_ticks}] {warn_str}"
 
@@ -1090,10 +1762,17 @@ class GridWorld:
 
     @property
     def grid(self):
-        """Numpy 2D array: Numpy array of shape x by y. Each grid[x,y] location contains a list with all
-        object IDs of the objects at that location"""
+        """Numpy 2D array: Numpy array of shape y by x. Each grid[y,x] location contains a list with all
+        object IDs of the objects at that location, or None if empty. Kept up to date incrementally as objects are
+        added, removed or moved, so it should only be read and never be altered directly."""
         return self.__grid
 
+    @property
+    def object_store(self):
+        """ObjectStore: Columnar store with the locations, traversability, movability, classes and carriers of all
+        objects and agents as numpy arrays. Kept up to date incrementally, so it should only be read."""
+        return self.__object_store
+
     @property
     def shape(self):
         """list: [x,y] shape of the grid """
@@ -1110,6 +1789,39 @@ class GridWorld:
          processing that needs to be done each tick by one or multiple agents. """
         return self.__tick_duration
 
+    @property
+    def tick_scheduler(self):
+        """TickScheduler: The scheduler that paces the ticks, with the statistics and histogram of their jitter. """
+        return self.__tick_scheduler
+
+    @property
+    def ticks_per_second(self):
+        """float: the number of ticks per second achieved during the last `run`, or None if it did not run yet. """
+        return self.__ticks_per_second
+
+    @property
+    def decision_overruns(self):
+        """dict: The number of times each agent exceeded the decision budget, agent IDs as keys. Agents that never
+        exceeded it are not included."""
+        return dict(self.__decision_overruns)
+
+    @property
+    def profiler(self):
+        """TickProfiler: The profiler with the duration of each phase of the ticks, or None if not profiling. """
+        return self.__profiler
+
+    @property
+    def action_recorder(self):
+        """ActionRecorder: The recording of what the agents decided in every tick, or None if not recording (see
+        `record_actions`). """
+        return self.__action_recorder
+
+    @property
+    def rooms(self):
+        """RoomRegistry: The rooms of this world, as added with `WorldBuilder.add_room` (or formed by other objects with
+        a room name). """
+        return self.__rooms
+
     @property
     def loggers(self):
         return self.__loggers
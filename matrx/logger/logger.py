@@ -52,6 +52,11 @@ class GridWorldLogger:
     """Log strategy to log every time a goal is reached or completed."""
     LOG_ON_GOAL_REACHED = "log_on_reached_goal"
 
+    """The IDs or names of the agents whose perception this logger uses (e.g. through their log data), or "*" for all
+    agents. The perception of these agents is computed in every tick, also while they are busy and their brain does not
+    need it (see `AgentBrain.needs_perception_when_busy`). Empty by default."""
+    agents_needing_perception = ()
+
     def __init__(self, log_strategy=1, save_path="/logs", file_name="", file_extension=".csv", delimiter=";"):
 
         warnings.warn(
@@ -339,6 +344,11 @@ class GridWorldLoggerV2:
     """Log strategy to log every time a goal is reached or completed."""
     LOG_ON_GOAL_REACHED = "log_on_reached_goal"
 
+    """The IDs or names of the agents whose perception this logger uses (e.g. through their log data), or "*" for all
+    agents. The perception of these agents is computed in every tick, also while they are busy and their brain does not
+    need it (see `AgentBrain.needs_perception_when_busy`). Empty by default."""
+    agents_needing_perception = ()
+
     def __init__(self, log_strategy=1, save_path="/logs", file_name="", file_extension=".csv", delimiter=";"):
 
         self.__log_strategy = log_strategy
@@ -33,6 +33,14 @@ class MessageManager:
 
         self.message_id = 0
 
+    def __getstate__(self):
+        """ Returns the state to pickle (e.g. for a snapshot of the GridWorld), with the agent IDs as a list instead of
+        the view on the agents of the GridWorld, as the latter cannot be pickled. """
+        state = self.__dict__.copy()
+        if state["agents"] is not None:
+            state["agents"] = list(state["agents"])
+        return state
+
     def preprocess_messages(self, tick, messages, all_agent_ids, teams):
         """ Preprocess messages for sending, such that they can be understood by the GridWorld.
 
@@ -432,6 +440,13 @@ class Chatroom:
         self.type = type
         self.agent_IDs = agent_IDs
 
+    def __getstate__(self):
+        """ Returns the state to pickle, with the agent IDs as a list as they may be a view on the agents of the
+        GridWorld which cannot be pickled. """
+        state = self.__dict__.copy()
+        state["agent_IDs"] = list(state["agent_IDs"])
+        return state
+
     def add_message(self, mssg):
         """ Add a message to the chatroom
 
@@ -1,6 +1,6 @@
 from matrx.agents.capabilities.capability import SenseCapability
 from matrx.actions.action import Action
-from matrx.objects.env_object import EnvObject
+from matrx.objects.env_object import EnvObject, FrozenProperties, _copy_mutable
 
 
 class AgentBody(EnvObject):
@@ -188,15 +188,25 @@ class AgentBody(EnvObject):
         agent, and its starting tick
         """
         self.__last_action_duration_data = {"duration_in_ticks": action_duration, "tick": curr_tick}
+        self._invalidate_properties()
 
     def _check_agent_busy(self, curr_tick):
         """
         check if the agent is done with executing the action
         """
-        self.__is_blocked = curr_tick <= (self.current_action_tick_started + self.current_action_duration_in_ticks)
+        is_blocked = self._is_busy(curr_tick)
+        if is_blocked != self.__is_blocked:
+            self.__is_blocked = is_blocked
+            self._invalidate_properties()
 
         return self.__is_blocked
 
+    def _is_busy(self, curr_tick):
+        """
+        check if the agent is done with executing the action, without updating its 'is_blocked_by_action' property
+        """
+        return curr_tick <= (self.current_action_tick_started + self.current_action_duration_in_ticks)
+
     def _at_last_action_duration_tick(self, curr_tick):
         """ Returns True if this agent is at its last tick of the action's duration."""
         is_last_tick = curr_tick == (self.current_action_tick_started + self.current_action_duration_in_ticks)
@@ -217,6 +227,7 @@ class AgentBody(EnvObject):
         """
         self.__current_action = action_name
         self.__current_action_args = action_args
+        self._invalidate_properties()
 
     def _set_agent_changed_properties(self, props: dict):
         """
@@ -309,6 +320,7 @@ class AgentBody(EnvObject):
         # We check if it is a custom property and if so change it simply in the dictionary
         elif property_name in self.custom_properties.keys():
             self.custom_properties[property_name] = property_value
+            self._properties_changed()
         else:
             raise Exception(f"Couldn't change property {property_name} for object with ID {self.obj_id} as it doesn't exist (use `add_property()` instead) or isn't allowed to be changed.")
 
@@ -339,23 +351,19 @@ class AgentBody(EnvObject):
         """
         assert isinstance(loc, list) or isinstance(loc, tuple)
         assert len(loc) == 2
-        # Set the location to our private location xy list
-        self.__location = loc
-
-        # Carrying action is done here
-        # First we check if we even have a 'carrying' property, as the future might hold an Agent's body who
-        # specifically removes this property. In that case we return.
-        if 'carrying' not in self.properties.keys():
-            return
-        # Next we retrieve whatever it is the Agent's body is carrying (if we have a 'carrying' property at all)
-        carried_objs = self.properties['carrying']
-        # If we carry nothing, we are done
-        if len(carried_objs) == 0:
-            return
-        # Otherwise we loop over all objects and adjust their location accordingly (since these are also EnvObjects,
-        # their setter for location gets called, in the case we are carrying an Agent's body this setter is called
-        for obj in carried_objs:
-            obj.location = loc  # this requires all objects in self.properties['carrying'] to be of type EnvObject
+        # Set the location to our private location xy list, and inform the GridWorld (if registered) of the move
+        if self._callback_location_changed is None:
+            self.__location = loc
+        else:
+            prev_loc = self.location
+            self.__location = loc
+            self._callback_location_changed(self, prev_loc)
+
+        # Carrying action is done here, we loop over all carried objects and adjust their location accordingly (since
+        # these are also EnvObjects, their setter for location gets called, in the case we are carrying an Agent's body
+        # this setter is called
+        for obj in self.is_carrying:
+            obj.location = loc
 
     @property
     def properties(self):
@@ -365,26 +373,36 @@ class AgentBody(EnvObject):
 
         In the case we return the properties of a class that inherits from EnvObject, we check if that class has
 
+        The properties are composed once and the same dictionary is returned until they change (see
+        `properties_version`), so it can not be modified (see `FrozenProperties`). Use `change_property` instead.
+
         Returns
         -------
         Properties : dict
             All mandatory and custom properties in a dictionary.
         """
 
-        # Copy the custom properties
-        properties = self.custom_properties.copy()
+        # Reuse the snapshot of the properties if none changed since it was composed, including those of the carried
+        # objects. The latter are kept in place in the is_carrying list, so we also check whether that list changed.
+        snapshot = self._properties_snapshot
+        carried_versions = [(obj, obj.properties_version) for obj in self.is_carrying]
+        if snapshot is not None and snapshot[0] == carried_versions:
+            return snapshot[1]
+
+        # Copy the custom properties, including their mutable values as the snapshot is kept by states
+        properties = {name: _copy_mutable(value) for name, value in self.custom_properties.items()}
 
         # Add all mandatory properties. Make sure that these are updated if one are added to the constructor!
         properties['team'] = self.team
         properties['name'] = self.obj_name
         properties['obj_id'] = self.obj_id  # we return id as well, but this should never ever be modified!
-        properties['location'] = self.location
+        properties['location'] = _copy_mutable(self.location)
         properties['is_movable'] = self.is_movable
-        properties['action_set'] = self.action_set
-        properties['carried_by'] = self.carried_by
+        properties['action_set'] = _copy_mutable(self.action_set)
+        properties['carried_by'] = _copy_mutable(self.carried_by)
         properties['is_human_agent'] = self.is_human_agent
         properties['is_traversable'] = self.is_traversable
-        properties['class_inheritance'] = self.class_inheritance
+        properties['class_inheritance'] = _copy_mutable(self.class_inheritance)
         properties['is_blocked_by_action'] = self.is_blocked
         properties['is_carrying'] = [obj.properties for obj in self.is_carrying]
         properties['sense_capability'] = self.sense_capability.get_capabilities()
@@ -401,13 +419,15 @@ class AgentBody(EnvObject):
         # Add the current action and all of its data
         properties['current_action'] = self.current_action
         if self.current_action is not None:  # all None actions are 'idle' actions and have no name or result
-            properties['current_action_args'] = self.current_action_args  # the action arguments
+            properties['current_action_args'] = _copy_mutable(self.current_action_args)  # the action arguments
         else:
             properties['current_action_args'] = {}
 
         properties['current_action_duration'] = self.current_action_duration_in_ticks
         properties['current_action_started_at_tick'] = self.current_action_tick_started
 
+        properties = FrozenProperties(properties)
+        self._properties_snapshot = (carried_versions, properties)
         return properties
 
     @properties.setter
@@ -1,3 +1,5 @@
+import copy
+
 import matrx.defaults as defaults
 import warnings
 import re
@@ -30,6 +32,10 @@ class EnvObject:
      create your own object as long as it inherits from this class. Then you can implement the update_properties
      method. The Battery object is such an example, which simply decreases its energy level property each time step.
 
+     Only objects whose class overrides `update` are updated by the GridWorld, so objects that do not need it cost
+     nothing each tick. An object that does not need to be updated every tick can set `update_interval` to the number
+     of ticks between two updates, e.g. 10 to be updated once every 10 ticks.
+
      If you have a specific object you need to create a lot and you do not want to keep on setting every property
      every time for the custom_properties, you can make your own class again which must inherit from this class and
      only implement its constructor where these custom properties are set with your default value
@@ -73,6 +79,15 @@ class EnvObject:
         For example the property 'heat'=2.4 of an EnvObject representing a fire.
      """
 
+    # The number of ticks between two calls to `update` by the GridWorld, by default every tick. Can be overridden by
+    # subclasses or set per object.
+    update_interval = 1
+
+    # The version of the properties, increased whenever they change, and their snapshot as composed by `properties`
+    # which is reused until they change. Overridden per object once its properties change.
+    _properties_version = 0
+    _properties_snapshot = None
+
     def __init__(self, location, name, class_callable, is_traversable=None, is_movable=None,
                  visualize_size=None, visualize_shape=None, visualize_colour=None, visualize_depth=None,
                  visualize_opacity=None, visualize_from_center=None, **custom_properties):
@@ -80,6 +95,13 @@ class EnvObject:
         # Set the object's name.
         self.obj_name = name
 
+        # Callback to the GridWorld this object is registered in, called whenever the location changes so the world
+        # can keep its occupancy grid up to date. Set by the GridWorld on registration, None otherwise.
+        self._callback_location_changed = None
+        # Callback to the GridWorld this object is registered in, called whenever a property changes so the world knows
+        # its cached properties of this object are outdated. Set by the GridWorld on registration, None otherwise.
+        self._callback_properties_changed = None
+
         # Obtain a unique ID based on a global object counter, if not already set as an attribute in a super class
         # spaces are not allowed
         if not hasattr(self, "obj_id"):
@@ -165,7 +187,8 @@ class EnvObject:
 
         If you want this functionality, you should create a new object that inherits from this class EnvObject.
 
-        This method is called automatically in the game-loop inside a running GridWorld instance.
+        This method is called automatically in the game-loop inside a running GridWorld instance, once every
+        `update_interval` ticks. It is only called for objects whose class overrides this method.
 
         Parameters
         ----------
@@ -194,6 +217,7 @@ class EnvObject:
         # We check if it is a custom property and if so change it simply in the dictionary
         if property_name in self.custom_properties.keys():
             self.custom_properties[property_name] = property_value
+            self._properties_changed()
             return self.properties
 
         # check if property_name is a mandatory class attribute that is also a property
@@ -252,6 +276,47 @@ class EnvObject:
         else:
             # We always add it as a custom property
             self.custom_properties[property_name] = property_value
+            self._properties_changed()
+
+    def __setattr__(self, name, value):
+        """
+        Sets the attribute as usual, but whenever a public attribute is set, as it may be one of the object's
+        properties (e.g. `is_traversable` or `location`), the snapshot of the properties is outdated and the GridWorld
+        is informed.
+
+        Note that changes made to the `custom_properties` dictionary directly are not noticed, use `change_property`
+        or `add_property` instead.
+        """
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._properties_changed()
+
+    def _properties_changed(self):
+        """ Marks the snapshot of the properties as outdated, and informs the GridWorld (if any) that the properties of
+        this object changed. """
+        self._invalidate_properties()
+        callback = self.__dict__.get("_callback_properties_changed")
+        if callback is not None:
+            callback(self)
+
+    def _invalidate_properties(self):
+        """ Marks the snapshot of the properties as outdated, without informing the GridWorld. """
+        # Set through the dictionary, as this is called for every public attribute that is set
+        self.__dict__["_properties_version"] = self._properties_version + 1
+        self.__dict__["_properties_snapshot"] = None
+
+    @property
+    def properties_version(self):
+        """
+        The version of the properties of this object, which increases whenever one of them changes. Can be used to
+        check whether previously obtained properties are outdated.
+
+        Returns
+        -------
+        Version : int
+            The current version of the properties.
+        """
+        return self._properties_version
 
     @property
     def location(self):
@@ -279,7 +344,14 @@ class EnvObject:
         """
         assert isinstance(loc, list) or isinstance(loc, tuple)
         assert len(loc) == 2
+        if self._callback_location_changed is None:
+            self.__location = loc
+            return
+
+        # Inform the GridWorld of the move, so it can update its occupancy grid
+        prev_loc = self.location
         self.__location = loc
+        self._callback_location_changed(self, prev_loc)
 
     @property
     def properties(self):
@@ -289,22 +361,31 @@ class EnvObject:
 
         In the case we return the properties of a class that inherits from EnvObject, we check if that class has
 
+        The properties are composed once and the same dictionary is returned until they change (see
+        `properties_version`), so it can not be modified (see `FrozenProperties`). Use `change_property` or
+        `add_property` instead.
+
         Returns
         -------
         All mandatory and custom properties in a dictionary.
         """
 
-        # Copy the custom properties
-        properties = self.custom_properties.copy()
+        # Reuse the snapshot of the properties if none changed since it was composed
+        snapshot = self._properties_snapshot
+        if snapshot is not None:
+            return snapshot
+
+        # Copy the custom properties, including their mutable values as the snapshot is kept by states
+        properties = {name: _copy_mutable(value) for name, value in self.custom_properties.items()}
 
         # Add all mandatory properties. Make sure that these are updated if one are added to the constructor!
         properties['name'] = self.obj_name
         properties['obj_id'] = self.obj_id  # we return id as well, but this should never ever be modified!
-        properties['location'] = self.location
+        properties['location'] = _copy_mutable(self.location)
         properties['is_movable'] = self.is_movable
-        properties['carried_by'] = self.carried_by
+        properties['carried_by'] = _copy_mutable(self.carried_by)
         properties['is_traversable'] = self.is_traversable
-        properties['class_inheritance'] = self.class_inheritance
+        properties['class_inheritance'] = _copy_mutable(self.class_inheritance)
         properties['visualization'] = {
             "size": self.visualize_size,
             "shape": self.visualize_shape,
@@ -314,6 +395,8 @@ class EnvObject:
             "visualize_from_center": self.visualize_from_center
         }
 
+        properties = FrozenProperties(properties)
+        self._properties_snapshot = properties
         return properties
 
     @properties.setter
@@ -340,3 +423,38 @@ def _get_inheritence_path(callable_class):
     parents = callable_class.mro()
     parents = [str(p.__name__) for p in parents]
     return parents
+
+
+def _copy_mutable(value):
+    """ Returns a deep copy of the given value if it is a list, dictionary or set, and the value itself otherwise.
+
+    Used when composing the snapshot of an object's properties, as that snapshot is kept by the states in which the
+    object occurs. Otherwise changing such a value of the object in place (e.g. appending to a list) would also change
+    it in all those states.
+    """
+    if isinstance(value, (list, dict, set)):
+        return copy.deepcopy(value)
+    return value
+
+
+class FrozenProperties(dict):
+    """ A dictionary of object properties that can not be changed in place, as returned by `EnvObject.properties`.
+
+    The same properties are shared by the object and every state in which it occurs (see
+    :class:`matrx.agents.agent_utils.state.State`) until they change. Changing them in place would change them in all
+    those places at once, so this raises a TypeError instead. Use `EnvObject.change_property` to change the object, or
+    `State.change_property` to change the properties only within a state. A changeable copy can be obtained with
+    `copy()` or `dict(...)`. The mutable values (e.g. lists) within the properties are copies of those of the object, so changing
+    the object in place does not change the states, but these values should not be changed either.
+    """
+
+    def __reduce__(self):
+        # Copying and pickling create the dictionary at once, instead of setting the items one by one
+        return type(self), (dict(self),)
+
+    def __readonly(self, *args, **kwargs):
+        raise TypeError(f"The properties of object {self.get('obj_id')} are shared between states and can not be "
+                        f"changed in place. Use `change_property` or change a copy instead.")
+
+    __setitem__ = __delitem__ = __ior__ = __readonly
+    clear = pop = popitem = setdefault = update = __readonly
@@ -0,0 +1,226 @@
+import numpy as np
+
+
+class ObjectStore:
+    """ A columnar store with the attributes of all objects and agents in a GridWorld, one numpy array per attribute.
+
+    The store keeps, per object and agent, its x and y coordinates, whether it is traversable and movable, and the
+    index of its class. This allows queries over all objects, such as which objects are within a range or which cells
+    are intraversable, to be computed with numpy instead of one object at a time. In addition it keeps an index of the
+    agents carrying each carried object. Carried objects are removed from the grid, so they have no row in the arrays
+    and this index is by object ID instead.
+
+    The objects themselves remain the owners of their attributes. The GridWorld informs the store whenever objects are
+    added or removed, or when their location or properties change, upon which the store updates its arrays. The
+    `GrabObject` and `DropObject` actions and `GridWorld.remove_from_grid` inform it when objects are (no longer)
+    carried.
+
+    The rows of the arrays are the environment objects followed by the agents, both in the order in which they were
+    registered.
+    """
+
+    def __init__(self, environment_objects, registered_agents):
+        """ Create the store for the given (mutable) dictionaries of objects and agents of a GridWorld.
+
+        Parameters
+        ----------
+        environment_objects : OrderedDict
+            The environment objects of the GridWorld, object IDs as keys and the objects as values.
+        registered_agents : OrderedDict
+            The agents of the GridWorld, agent IDs as keys and their bodies as values.
+        """
+        self.__environment_objects = environment_objects
+        self.__registered_agents = registered_agents
+
+        self.__objects = []  # (obj_id, obj) pairs of all environment objects followed by all agents
+        self.__rows = {}  # obj_id (keys) and the row of that object in the arrays below (values)
+        self.__x = np.zeros(0, dtype=int)  # the x coordinate of each object
+        self.__y = np.zeros(0, dtype=int)  # the y coordinate of each object
+        self.__is_traversable = np.zeros(0, dtype=bool)  # whether each object is traversable
+        self.__is_movable = np.zeros(0, dtype=bool)  # whether each object is movable
+        self.__class_ids = np.zeros(0, dtype=int)  # the index in self.__classes of the class of each object
+        self.__classes = []  # all distinct classes of the objects
+        self.__carried_by = {}  # the IDs of all carried objects (keys) and a tuple of the agents carrying them (values)
+        self.__class_masks = {}  # object types (keys) and their class mask (values), see get_class_mask
+        self.__is_outdated = True  # whether objects were added or removed since the arrays were created
+
+        # Incremented whenever objects move, are added or removed. Can be used to check whether previously computed
+        # results that depend on the locations of objects are still valid.
+        self.version = 0
+
+    def objects_changed(self):
+        """ Informs the store that objects or agents were added or removed. """
+        self.__is_outdated = True
+        self.version += 1
+
+    def location_changed(self, obj):
+        """ Informs the store that the location of the given object or agent changed. """
+        if not self.__is_outdated:
+            row = self.__rows[obj.obj_id]
+            self.__x[row], self.__y[row] = obj.location
+        self.version += 1
+
+    def carried_by_changed(self, obj_id, carried_by):
+        """ Informs the store that the agents carrying the given object changed.
+
+        Parameters
+        ----------
+        obj_id : str
+            The ID of the object.
+        carried_by : list
+            The IDs of the agents that now carry the object, empty if it is no longer carried.
+        """
+        if len(carried_by) > 0:
+            self.__carried_by[obj_id] = tuple(carried_by)
+        else:
+            self.__carried_by.pop(obj_id, None)
+
+    def properties_changed(self, obj):
+        """ Informs the store that (some of) the properties of the given object or agent changed. """
+        if not self.__is_outdated and obj.obj_id in self.__rows:
+            self.__set_attributes(self.__rows[obj.obj_id], obj)
+
+    @property
+    def objects(self):
+        """ The (obj_id, obj) pairs of all objects and agents, in the order of the rows of the arrays. """
+        self.__update()
+        return self.__objects
+
+    @property
+    def rows(self):
+        """ A dictionary with the object IDs as keys and their row in the arrays as values. """
+        self.__update()
+        return self.__rows
+
+    @property
+    def x(self):
+        self.__update()
+        return self.__x
+
+    @property
+    def y(self):
+        self.__update()
+        return self.__y
+
+    @property
+    def is_traversable(self):
+        self.__update()
+        return self.__is_traversable
+
+    @property
+    def is_movable(self):
+        self.__update()
+        return self.__is_movable
+
+    @property
+    def class_ids(self):
+        """ The index in `classes` of the class of each object. """
+        self.__update()
+        return self.__class_ids
+
+    @property
+    def classes(self):
+        """ The list of all distinct classes of the objects and agents. """
+        self.__update()
+        return self.__classes
+
+    @property
+    def carried_by(self):
+        """ A dictionary with the IDs of all carried objects as keys and a tuple of the IDs of the agents carrying them
+        as values. """
+        return self.__carried_by
+
+    def get_class_mask(self, object_type):
+        """ Returns for each class in `classes` whether its objects are an instance of the given object type.
+
+        Parameters
+        ----------
+        object_type : Class, tuple of Classes or None
+            The type the objects should be an instance of. When None or "*", all classes match.
+
+        Returns
+        -------
+        ndarray
+            A boolean array with for each class whether it matches. Index it with `class_ids` to obtain the mask per
+            object.
+        """
+        self.__update()
+        if object_type is None or object_type == "*":
+            return np.ones(len(self.__classes), dtype=bool)
+
+        class_mask = self.__class_masks.get(object_type)
+        if class_mask is None:
+            mask = []
+            for cls in self.__classes:
+                try:
+                    mask.append(issubclass(cls, object_type))
+                except TypeError:  # not a class, so nothing can be an instance of it
+                    mask.append(False)
+            class_mask = np.array(mask, dtype=bool)
+            self.__class_masks[object_type] = class_mask
+        return class_mask
+
+    def get_rows_in_range(self, location, object_type, sense_range):
+        """ Returns the rows of all objects and agents of the given type within the given range of a location, in the
+        order of the rows.
+
+        Parameters
+        ----------
+        location : list or tuple
+            The [x, y] location from which to search.
+        object_type : Class, tuple of Classes or None
+            The type the objects should be an instance of. When None or "*", all types match.
+        sense_range : float
+            The (Euclidean) range within which the objects should be.
+
+        Returns
+        -------
+        ndarray
+            The rows of the found objects.
+        """
+        self.__update()
+        diff_x = self.__x - location[0]
+        diff_y = self.__y - location[1]
+        in_range = np.sqrt(diff_x * diff_x + diff_y * diff_y) <= sense_range
+        return np.flatnonzero(in_range & self.get_class_mask(object_type)[self.__class_ids])
+
+    def get_intraversable_map(self, shape):
+        """ Returns a boolean array of the given grid shape, which is True for each cell with an intraversable object
+        or agent. Note that the array is indexed as [y, x], just as the grid of the GridWorld.
+        """
+        self.__update()
+        intraversable = ~self.__is_traversable
+        cells = np.zeros((shape[1], shape[0]), dtype=bool)
+        cells[self.__y[intraversable], self.__x[intraversable]] = True
+        return cells
+
+    def __update(self):
+        """ (Re)creates the arrays from all current objects and agents, if objects were added or removed. """
+        if not self.__is_outdated:
+            return
+
+        self.__objects = list(self.__environment_objects.items()) + list(self.__registered_agents.items())
+        self.__rows = {obj_id: row for row, (obj_id, _) in enumerate(self.__objects)}
+
+        nr_objects = len(self.__objects)
+        self.__x = np.zeros(nr_objects, dtype=int)
+        self.__y = np.zeros(nr_objects, dtype=int)
+        self.__is_traversable = np.zeros(nr_objects, dtype=bool)
+        self.__is_movable = np.zeros(nr_objects, dtype=bool)
+
+        class_lookup = {}
+        class_ids = []
+        for row, (_, obj) in enumerate(self.__objects):
+            self.__x[row], self.__y[row] = obj.location
+            self.__set_attributes(row, obj)
+            class_ids.append(class_lookup.setdefault(type(obj), len(class_lookup)))
+        self.__classes = list(class_lookup.keys())
+        self.__class_ids = np.array(class_ids, dtype=int)
+        self.__class_masks = {}
+
+        self.__is_outdated = False
+
+    def __set_attributes(self, row, obj):
+        """ Sets the traversability and movability of the object in the given row. """
+        self.__is_traversable[row] = bool(obj.is_traversable)
+        self.__is_movable[row] = bool(obj.is_movable)
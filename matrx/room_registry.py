@@ -0,0 +1,92 @@
+from matrx.objects.standard_objects import Wall, Door, AreaTile
+
+
+class RoomRegistry:
+    """ The rooms of a GridWorld, which are formed by the objects with a room name as created by the `WorldBuilder`
+    (e.g. the walls, doors and area tiles added with `WorldBuilder.add_room`).
+
+    For each room the registry holds its bounds (the top left and bottom right location of its objects), the IDs of its
+    objects and of the walls, doors and area tiles among them, and the locations within its bounds. Rooms do not change
+    once the world is created, so the registry is created once with the world. Every state of the world receives the
+    rooms as plain data in its world info (see `room_info`), which allows the room helpers of a `State` to look up the
+    objects of a room instead of searching the whole state for them.
+    """
+
+    def __init__(self):
+        """ Create an empty registry. """
+        self.__room_info = {}  # room names (keys) and a dictionary with the room's bounds and IDs (values)
+        self.__interiors = {}  # room names (keys) and the locations within the room's bounds (values)
+
+    def __getstate__(self):
+        """ Returns the state to pickle (e.g. for a snapshot of the GridWorld), without the interiors as these can be
+        large and are recomputed from the bounds. """
+        return self.__room_info
+
+    def __setstate__(self, state):
+        self.__room_info = state
+        self.__interiors = {name: self.__get_interior(room["top_left"], room["bottom_right"])
+                            for name, room in state.items()}
+
+    def __contains__(self, room_name):
+        return room_name in self.__room_info
+
+    def __len__(self):
+        return len(self.__room_info)
+
+    @property
+    def room_names(self):
+        """ The names of all rooms, in the order in which their first object was created. """
+        return list(self.__room_info.keys())
+
+    @property
+    def room_info(self):
+        """ The rooms as plain data, as given to every state in its world info (see `State.get_room_registry`). The
+        room names are the keys and the values are as returned by `get_room`, without the interior. These are shared
+        by all states and should not be changed. """
+        return self.__room_info
+
+    def get_room(self, room_name):
+        """ Returns the registered information of a room.
+
+        Parameters
+        ----------
+        room_name : str
+            The name of the room.
+
+        Returns
+        -------
+        dict or None
+            The name of the room ("name"), the top left ("top_left") and bottom right ("bottom_right") location of its
+            objects, the IDs of all its objects in the order in which they were created ("object_ids") and of its walls
+            ("wall_ids"), doors ("door_ids") and area tiles ("area_ids"), and the locations within its bounds
+            ("interior"). All are tuples, which should not be changed. None when there is no room with the given name.
+        """
+        room = self.__room_info.get(room_name)
+        if room is None:
+            return None
+        return {**room, "interior": self.__interiors[room_name]}
+
+    def _add_room(self, room_name, objects):
+        """ Registers a room with the given objects (in the order in which they were created), which should all have a
+        location and the room name. """
+        xs = [obj.location[0] for obj in objects]
+        ys = [obj.location[1] for obj in objects]
+        top_left, bottom_right = (min(xs), min(ys)), (max(xs), max(ys))
+
+        def ids_of(class_name):
+            return tuple(obj.obj_id for obj in objects if class_name in obj.class_inheritance)
+
+        self.__room_info[room_name] = {"name": room_name,
+                                       "top_left": top_left,
+                                       "bottom_right": bottom_right,
+                                       "object_ids": tuple(obj.obj_id for obj in objects),
+                                       "wall_ids": ids_of(Wall.__name__),
+                                       "door_ids": ids_of(Door.__name__),
+                                       "area_ids": ids_of(AreaTile.__name__)}
+        self.__interiors[room_name] = self.__get_interior(top_left, bottom_right)
+
+    @staticmethod
+    def __get_interior(top_left, bottom_right):
+        # All locations within the bounds, row by row
+        return tuple((x, y) for y in range(top_left[1] + 1, bottom_right[1])
+                     for x in range(top_left[0] + 1, bottom_right[0]))
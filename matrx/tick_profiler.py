@@ -0,0 +1,234 @@
+import json
+import threading
+import time
+from collections import deque
+
+
+class TickProfiler:
+    """ Measures how long each phase of the ticks of a GridWorld takes, in total and per agent.
+
+    The GridWorld reports the time spent in each of the following phases:
+
+    * "world_state": composing the complete (god view) state of the world.
+    * "goal_checks": checking whether the simulation goal is reached.
+    * "loggers": obtaining the log data of agents and calling the loggers.
+    * "perception": computing what each agent perceives and composing its state.
+    * "filter_observations": the `filter_observations` of each agent. For busy agents, whose state is updated without
+      deciding, this includes updating their state.
+    * "decide_on_action": the `decide_on_action` of each agent that is not busy.
+    * "agent_decisions": the remainder of the decision of each agent that is not busy, such as updating its state (and
+      for a brain hosted in another process, sending its state and receiving its decision). The time spent in its
+      `filter_observations` and `decide_on_action` is only included when its brain does not report these (see
+      `AgentBrain.decision_durations`).
+    * "messages": obtaining, preprocessing and sending the messages of agents.
+    * "actions": checking whether the actions of agents are possible and performing them.
+    * "grid_updates": updating the grid and object store when objects move, which mostly happens while performing
+      actions.
+    * "env_object_updates": the `update` method of all environment objects.
+    * "api": storing the states for the API.
+    * "tick": the complete tick, without the time spent waiting for the next tick.
+
+    The phases are exclusive: time spent in a phase that is measured within another phase (e.g. "grid_updates" while
+    performing actions) only counts for the inner phase, so the phases of a tick add up to at most its "tick". The
+    exception is when agents decide in parallel, as their decision times are summed. The time spent for an agent does
+    include the phases measured within one of that agent.
+
+    For each phase (and each agent), rolling statistics are kept over the most recent ticks, as well as totals over all
+    ticks since the profiler was created or reset. Phases in which no time was spent during a tick count as zero.
+    """
+
+    # The phases of a tick, in the order in which they occur in a tick
+    PHASES = ("world_state", "goal_checks", "loggers", "perception", "filter_observations", "decide_on_action",
+              "agent_decisions", "messages", "actions", "grid_updates", "env_object_updates", "api", "tick")
+
+    def __init__(self, window=100):
+        """ Create a profiler.
+
+        Parameters
+        ----------
+        window : int (optional, default 100)
+            The number of most recent ticks over which the rolling statistics are computed.
+        """
+        self.__window = window
+        self.__lock = threading.Lock()  # agents may decide on multiple threads
+        self.__local = threading.local()  # the measurements in progress on each thread, see `add`
+        self.reset()
+
+    def __getstate__(self):
+        """ Returns the state to pickle (e.g. for a snapshot of the GridWorld), without the lock. """
+        state = self.__dict__.copy()
+        del state["_TickProfiler__lock"]
+        del state["_TickProfiler__local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+
+    def reset(self):
+        """ Removes all measurements. """
+        with self.__lock:
+            self.__nr_ticks = 0
+            self.__current = {}  # phase or agent ID (keys) and the time spent in the current tick (values)
+            self.__recent = {}  # phase or agent ID (keys) and a deque of the time spent in the most recent ticks
+            self.__totals = {}  # phase or agent ID (keys) and the total and maximum time spent in a tick (values)
+
+    def measure(self, phase, agent_id=None):
+        """ Returns a context manager that adds the time spent within it to the given phase of the current tick,
+        excluding the time measured within it (by nested measurements or `add`).
+
+        Parameters
+        ----------
+        phase : str
+            The phase, one of `PHASES`.
+        agent_id : str (optional, default None)
+            The ID of the agent for which the time is spent, if any.
+
+        Examples
+        --------
+        >>> with profiler.measure("actions", agent_id):
+        >>>     perform_action()
+        """
+        return _Measurement(self, phase, agent_id)
+
+    def add(self, phase, duration, agent_id=None):
+        """ Adds the given duration (in seconds) to the given phase of the current tick, and to the given agent.
+
+        When called within a measurement on the same thread, the duration is excluded from that measurement, and is
+        added to its agent when no agent is given.
+        """
+        measurements = self.__get_measurements()
+        if measurements:
+            measurements[-1][0] += duration
+            if agent_id is None:
+                agent_id = measurements[-1][1]
+
+        with self.__lock:
+            self.__current[phase] = self.__current.get(phase, 0.) + duration
+            if agent_id is not None:
+                key = ("agent", agent_id)
+                self.__current[key] = self.__current.get(key, 0.) + duration
+
+    def end_tick(self):
+        """ Adds the measurements of the current tick to the statistics, and starts a new tick. """
+        with self.__lock:
+            current, self.__current = self.__current, {}
+            self.__nr_ticks += 1
+
+            for key in set(self.__recent.keys()) | set(current.keys()):
+                duration = current.get(key, 0.)
+                if key not in self.__recent:
+                    self.__recent[key] = deque(maxlen=self.__window)
+                    self.__totals[key] = [0., 0.]
+                self.__recent[key].append(duration)
+                totals = self.__totals[key]
+                totals[0] += duration
+                totals[1] = max(totals[1], duration)
+
+    def _start_measurement(self, agent_id):
+        """ Registers a measurement that is started on this thread. """
+        measurements = self.__get_measurements()
+        if agent_id is None and measurements:
+            agent_id = measurements[-1][1]
+        measurements.append([0., agent_id])  # the time measured within it, and its agent
+
+    def _end_measurement(self, phase, duration):
+        """ Adds the duration of the last measurement started on this thread, excluding the time measured within it. """
+        nested_duration, agent_id = self.__get_measurements().pop()
+        measurements = self.__get_measurements()
+        if measurements:
+            # The enclosing measurement excludes all time measured within this one, which `add` does not include
+            measurements[-1][0] += nested_duration
+        self.add(phase, duration - nested_duration, agent_id)
+
+    def __get_measurements(self):
+        """ Returns the stack of measurements in progress on this thread. """
+        measurements = getattr(self.__local, "measurements", None)
+        if measurements is None:
+            measurements = self.__local.measurements = []
+        return measurements
+
+    @property
+    def nr_ticks(self):
+        """ The number of ticks that were measured. """
+        return self.__nr_ticks
+
+    def get_statistics(self):
+        """ Returns the rolling statistics over the most recent ticks.
+
+        Returns
+        -------
+        dict
+            With the number of measured ticks ("nr_ticks"), the number of ticks the statistics are computed over
+            ("window"), and the statistics per phase ("phases") and agent ("agents"). The statistics are a dictionary
+            with the time (in seconds) spent in the last tick ("last"), and the mean ("mean") and maximum ("max") time
+            spent in a tick.
+        """
+        # Copy the measurements under the lock, as the GridWorld may end a tick while these are read (e.g. by the API)
+        with self.__lock:
+            nr_ticks = self.__nr_ticks
+            recent = {key: list(durations) for key, durations in self.__recent.items()}
+
+        stats_per_key = {}
+        for key, durations in recent.items():
+            stats_per_key[key] = {"last": durations[-1], "mean": sum(durations) / len(durations),
+                                  "max": max(durations)}
+        phases, agents = self.__split(stats_per_key)
+        return {"nr_ticks": nr_ticks, "window": min(self.__window, nr_ticks), "phases": phases, "agents": agents}
+
+    def get_summary(self):
+        """ Returns the statistics over all measured ticks.
+
+        Returns
+        -------
+        dict
+            With the number of measured ticks ("nr_ticks") and the statistics per phase ("phases") and agent
+            ("agents"). The statistics are a dictionary with the total time (in seconds) spent ("total"), and the mean
+            ("mean") and maximum ("max") time spent in a tick.
+        """
+        with self.__lock:
+            nr_ticks = self.__nr_ticks
+            totals = {key: tuple(totals) for key, totals in self.__totals.items()}
+
+        stats_per_key = {}
+        for key, (total, maximum) in totals.items():
+            stats_per_key[key] = {"total": total, "mean": total / max(1, nr_ticks), "max": maximum}
+        phases, agents = self.__split(stats_per_key)
+        return {"nr_ticks": nr_ticks, "phases": phases, "agents": agents}
+
+    def dump_summary(self, file_path):
+        """ Writes the statistics over all measured ticks (see `get_summary`) as JSON to the given file. """
+        with open(file_path, "w") as f:
+            json.dump(self.get_summary(), f, indent=4)
+
+    def __split(self, stats_per_key):
+        """ Splits statistics per phase or agent into those of the phases (in the order of `PHASES`) and agents. """
+        phases, agents = {}, {}
+        for key, stats in stats_per_key.items():
+            if isinstance(key, tuple):
+                agents[key[1]] = stats
+            else:
+                phases[key] = stats
+        order = {phase: idx for idx, phase in enumerate(self.PHASES)}
+        phases = dict(sorted(phases.items(), key=lambda item: order.get(item[0], len(order))))
+        return phases, agents
+
+
+class _Measurement:
+    """ Context manager that adds the time spent within it to a phase of a TickProfiler. """
+
+    def __init__(self, profiler, phase, agent_id):
+        self.__profiler = profiler
+        self.__phase = phase
+        self.__agent_id = agent_id
+        self.__start = None
+
+    def __enter__(self):
+        self.__profiler._start_measurement(self.__agent_id)
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__profiler._end_measurement(self.__phase, time.perf_counter() - self.__start)
+        return False
@@ -0,0 +1,123 @@
+import bisect
+import time
+
+import gevent
+
+
+class TickScheduler:
+    """ Paces the ticks of a GridWorld using a monotonic clock and absolute tick deadlines.
+
+    Each tick has a deadline that is exactly one tick duration after the deadline of the previous tick, so the time
+    that sleeping overshoots or the time a tick takes does not accumulate over ticks. When a tick ends after its
+    deadline, the next ticks can catch up by sleeping less (or not at all), as long as the world is at most
+    `max_catch_up_ticks` tick durations behind. When the world is further behind, the ticks that were missed are
+    dropped and the deadlines start anew from the current time.
+
+    For every tick the jitter is recorded, which is the absolute difference between the time the tick ended (after
+    sleeping) and its deadline. These are kept in a histogram, see `get_jitter_histogram`.
+    """
+
+    # The upper bounds (in seconds) of the bins of the jitter histogram, the last bin contains all larger jitters
+    JITTER_BINS = (0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+
+    def __init__(self, tick_duration, max_catch_up_ticks=0):
+        """ Create a scheduler.
+
+        Parameters
+        ----------
+        tick_duration : float
+            The desired duration of a tick in seconds.
+        max_catch_up_ticks : float (optional, default 0)
+            The maximum number of tick durations the world may be behind on its schedule and still catch up. When 0,
+            the schedule starts anew after every tick that takes too long, so no tick is shortened to catch up.
+        """
+        self.tick_duration = tick_duration
+        self.__max_catch_up_ticks = max_catch_up_ticks
+        self.__deadline = None  # the deadline of the current tick, None when there is no schedule yet
+
+        self.__jitter_counts = [0] * (len(self.JITTER_BINS) + 1)
+        self.__total_jitter = 0.
+        self.__max_jitter = 0.
+        self.nr_ticks = 0  # the number of ticks that were paced
+        self.nr_late_ticks = 0  # the number of ticks that ended after their deadline without sleeping
+        self.nr_dropped_ticks = 0  # the number of ticks dropped from the schedule as the world was too far behind
+
+    def reset(self):
+        """ Starts a new schedule from the next tick, e.g. after the world was paused. """
+        self.__deadline = None
+
+    def start_tick(self):
+        """ Informs the scheduler that a tick starts. Starts the schedule if there is none. """
+        if self.__deadline is None:
+            self.__deadline = time.perf_counter() + self.tick_duration
+
+    def time_left(self):
+        """ Returns the number of seconds until the deadline of the current tick, negative when it has passed. """
+        if self.__deadline is None:
+            return self.tick_duration
+        return self.__deadline - time.perf_counter()
+
+    def wait(self):
+        """ Sleeps until the deadline of the current tick, records the jitter and sets the deadline of the next tick.
+
+        Returns
+        -------
+        bool
+            Whether the tick ended before its deadline, i.e. whether there was time left to sleep.
+        """
+        self.start_tick()
+
+        in_time = self.time_left() > 0
+        if in_time:
+            gevent.sleep(self.time_left())
+        else:
+            self.nr_late_ticks += 1
+
+        now = time.perf_counter()
+        lateness = now - self.__deadline
+        self.__add_jitter(abs(lateness))
+        self.nr_ticks += 1
+
+        # The next deadline follows the current one, unless the tick took so long that we are too far behind to catch
+        # up. Then the missed ticks are dropped and the schedule starts anew.
+        if not in_time and lateness > self.__max_catch_up_ticks * self.tick_duration:
+            if self.tick_duration > 0:
+                self.nr_dropped_ticks += int(lateness // self.tick_duration)
+            self.__deadline = now + self.tick_duration
+        else:
+            self.__deadline += self.tick_duration
+
+        return in_time
+
+    def get_jitter_histogram(self):
+        """ Returns the histogram of the jitter of all paced ticks.
+
+        Returns
+        -------
+        list
+            A list with a dictionary per bin, with the upper bound of the jitter in seconds in that bin ("max_jitter",
+            None for the last bin) and the number of ticks with a jitter in that bin ("count").
+        """
+        bounds = list(self.JITTER_BINS) + [None]
+        return [{"max_jitter": bound, "count": count} for bound, count in zip(bounds, self.__jitter_counts)]
+
+    def get_statistics(self):
+        """ Returns the statistics of the pacing of all ticks.
+
+        Returns
+        -------
+        dict
+            The number of paced ("nr_ticks"), late ("nr_late_ticks") and dropped ("nr_dropped_ticks") ticks, the mean
+            ("mean_jitter") and maximum ("max_jitter") jitter in seconds, and the jitter histogram ("jitter_histogram").
+        """
+        return {"nr_ticks": self.nr_ticks,
+                "nr_late_ticks": self.nr_late_ticks,
+                "nr_dropped_ticks": self.nr_dropped_ticks,
+                "mean_jitter": self.__total_jitter / max(1, self.nr_ticks),
+                "max_jitter": self.__max_jitter,
+                "jitter_histogram": self.get_jitter_histogram()}
+
+    def __add_jitter(self, jitter):
+        self.__jitter_counts[bisect.bisect_left(self.JITTER_BINS, jitter)] += 1
+        self.__total_jitter += jitter
+        self.__max_jitter = max(self.__max_jitter, jitter)
@@ -11,12 +11,14 @@ import numpy as np
 from matrx.agents.agent_brain import AgentBrain
 from matrx.agents.capabilities.capability import SenseCapability
 from matrx.agents.agent_types.human_agent import HumanAgentBrain
+from matrx.agents.agent_utils.brain_host import RemoteAgentBrain
 from matrx.grid_world import GridWorld
 from matrx.logger.logger import GridWorldLogger, GridWorldLoggerV2
 from matrx.objects.agent_body import AgentBody
 from matrx.objects.env_object import EnvObject, _get_inheritence_path
 from matrx import utils
 from matrx.agents.capabilities.capability import create_sense_capability
+from matrx.room_registry import RoomRegistry
 from matrx.objects.standard_objects import Wall, Door, AreaTile, SmokeTile, CollectionDropOffTile, CollectionTarget
 from matrx.goals.goals import LimitedTimeGoal, WorldGoal, CollectionGoal, WorldGoalV2
 
@@ -34,7 +36,9 @@ class WorldBuilder:
     def __init__(self, shape, tick_duration=0.5, random_seed=1,
                  simulation_goal=1000, run_matrx_api=True,
                  run_matrx_visualizer=False, visualization_bg_clr="#C2C2C2",
-                 visualization_bg_img=None, verbose=False):
+                 visualization_bg_img=None, verbose=False, headless=False,
+                 decision_threads=None, profile=False, decision_budget=None,
+                 overrun_policy="idle", max_catch_up_ticks=0, record_actions=False):
 
         """
         With the constructor you can set a number of general properties and
@@ -80,6 +84,54 @@ class WorldBuilder:
         verbose : bool (optional, False)
             Whether the subsequent created world should be verbose or not.
 
+        headless : bool (optional, False)
+            Whether the created worlds should run as fast as possible. This
+            ignores the tick duration, skips all work done for the API and
+            reports the achieved ticks per second at the end of a run. This
+            requires the API to be turned off.
+
+        decision_threads : int (optional, None)
+            The number of threads on which agents decide on their actions in
+            parallel. When None, agents decide one after the other. In
+            parallel, an agent only starts deciding after the agents added
+            before it that it perceives have decided, so agents that perceive
+            each other still decide one after the other. The decisions are
+            processed in the order in which the agents were added, which
+            gives the same result as deciding one after the other, see
+            `GridWorld` for the exceptions.
+
+        profile : bool (optional, False)
+            Whether the created worlds should measure the duration of each
+            phase of every tick, in total and per agent. The statistics are
+            available through the `profiler` property of a world and through
+            the API.
+
+        decision_budget : float (optional, None)
+            The maximum number of seconds an agent may take to decide on an
+            action. When None, worlds wait for every decision. Otherwise agents
+            decide on separate threads, and an agent that exceeds its budget is
+            handled according to the `overrun_policy` while its decision
+            continues in the background.
+
+        overrun_policy : str (optional, "idle")
+            What an agent does when its decision exceeds the
+            `decision_budget`, until that decision is done: "idle" to idle,
+            "reuse_last_action" to perform its last action again, or
+            "apply_next_tick" to idle and use the late decision on the first
+            tick after it is done.
+
+        max_catch_up_ticks : float (optional, 0)
+            Ticks are paced towards absolute deadlines. After ticks that took
+            longer than the tick duration, the following ticks catch up by
+            sleeping less as long as the world is at most this number of tick
+            durations behind. Otherwise the missed ticks are dropped. When 0,
+            worlds never catch up.
+
+        record_actions : bool (optional, False)
+            Whether worlds record the actions, messages and user input of
+            all agents in every tick, such that their runs can be replayed
+            without the agent brains. See `GridWorld.replay`.
+
         Raises
         ------
         ValueError
@@ -168,6 +220,30 @@ class WorldBuilder:
                              f"visualizer requires the api to work, so this "
                              f"is not possible.")
 
+        if headless and run_matrx_api:
+            raise ValueError(f"Headless is set to True while run_matrx_api "
+                             f"is set to True. A headless world runs "
+                             f"without the api, so this is not possible.")
+
+        if decision_threads is not None and (not isinstance(decision_threads, int) or decision_threads < 1):
+            raise ValueError(f"The given decision_threads {decision_threads} "
+                             f"should be None or an Int larger or equal "
+                             f"to 1.")
+
+        if decision_budget is not None and (not isinstance(decision_budget, (int, float)) or decision_budget <= 0):
+            raise ValueError(f"The given decision_budget {decision_budget} "
+                             f"should be None or a positive number of "
+                             f"seconds.")
+
+        if overrun_policy not in ("idle", "reuse_last_action", "apply_next_tick"):
+            raise ValueError(f"The given overrun_policy {overrun_policy} "
+                             f"should be one of 'idle', 'reuse_last_action' "
+                             f"or 'apply_next_tick'.")
+
+        if not isinstance(max_catch_up_ticks, (int, float)) or max_catch_up_ticks < 0:
+            raise ValueError(f"The given max_catch_up_ticks {max_catch_up_ticks} "
+                             f"should be a number larger or equal to 0.")
+
         # Set our random number generator
         self.rng = np.random.RandomState(random_seed)
         # Set our settings place holders
@@ -202,7 +278,14 @@ class WorldBuilder:
                                       visualization_bg_clr=visualization_bg_clr,
                                       visualization_bg_img=visualization_bg_img,
                                       verbose=self.verbose,
-                                      rnd_seed=random_seed)
+                                      rnd_seed=random_seed,
+                                      headless=headless,
+                                      decision_threads=decision_threads,
+                                      profile=profile,
+                                      decision_budget=decision_budget,
+                                      overrun_policy=overrun_policy,
+                                      max_catch_up_ticks=max_catch_up_ticks,
+                                      record_actions=record_actions)
         # Keep track of the number of worlds we created
         self.worlds_created = 0
 
@@ -564,7 +647,8 @@ class WorldBuilder:
 
         # Check if the agent is not of HumanAgent, if so; use the add_human_
         # agent method
-        inh_path = _get_inheritence_path(agent_brain.__class__)
+        brain_class = agent_brain.brain_class if isinstance(agent_brain, RemoteAgentBrain) else agent_brain.__class__
+        inh_path = _get_inheritence_path(brain_class)
         if 'HumanAgent' in inh_path:
             ValueError(f"You are adding an agent that is or inherits from "
                        f"HumanAgent with the name {name}. Use "
@@ -2078,7 +2162,9 @@ class WorldBuilder:
                           **{**area_custom_properties, "room_name": name})
 
     def __set_world_settings(self, shape, tick_duration, simulation_goal, rnd_seed,
-                             visualization_bg_clr, visualization_bg_img, verbose):
+                             visualization_bg_clr, visualization_bg_img, verbose, headless,
+                             decision_threads, profile, decision_budget, overrun_policy,
+                             max_catch_up_ticks, record_actions):
 
         if rnd_seed is None:
             rnd_seed = self.rng.randint(0, 1000000)
@@ -2097,7 +2183,14 @@ class WorldBuilder:
                           "rnd_seed": rnd_seed,
                           "visualization_bg_clr": visualization_bg_clr,
                           "visualization_bg_img": visualization_bg_img,
-                          "verbose": verbose}
+                          "verbose": verbose,
+                          "headless": headless,
+                          "decision_threads": decision_threads,
+                          "profile": profile,
+                          "decision_budget": decision_budget,
+                          "overrun_policy": overrun_policy,
+                          "max_catch_up_ticks": max_catch_up_ticks,
+                          "record_actions": record_actions}
 
         return world_settings
 
@@ -2163,6 +2256,9 @@ class WorldBuilder:
         # Register all teams and who is in them
         world._register_teams()
 
+        # Register all rooms with the IDs their objects received when registered
+        world._register_rooms(self.__create_room_registry(objs))
+
         # Add all loggers if any
         for logger_class, arguments in self.loggers:
             logger = logger_class(**arguments)
@@ -2172,6 +2268,19 @@ class WorldBuilder:
         # Return the (successful/stable) world
         return world
 
+    def __create_room_registry(self, objs):
+        # Group the objects per room name (e.g. those of add_room), in the order in which they were created
+        objs_per_room = {}
+        for env_object in objs:
+            room_name = env_object.custom_properties.get("room_name")
+            if isinstance(room_name, str):
+                objs_per_room.setdefault(room_name, []).append(env_object)
+
+        rooms = RoomRegistry()
+        for room_name, room_objs in objs_per_room.items():
+            rooms._add_room(room_name, room_objs)
+        return rooms
+
     def __create_grid_world(self):
         args = self.world_settings
         # create a world ID in the shape of "world_" + world number + seeded random int
@@ -2271,7 +2380,7 @@ class WorldBuilder:
         args = {**mandatory_props,
                 'isAgent': True,
                 'sense_capability': sense_capability,
-                'class_callable': agent.__class__,
+                'class_callable': agent.brain_class if isinstance(agent, RemoteAgentBrain) else agent.__class__,
                 'callback_agent_get_action': agent._get_action,
                 'callback_agent_set_action_result': agent._set_action_result,
                 'callback_agent_observe': agent._fetch_state,